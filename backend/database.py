@@ -1,20 +1,158 @@
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from backend.services import metrics
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ai_pm.db")
+# Async driver URL for the AsyncSession data path; derived from DATABASE_URL when unset
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+# Async driver for each backend DATABASE_URL may name; others need ASYNC_DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+# "production" tunes the connection (WAL + pragmas on SQLite) and the pool;
+# "basic" is the plain create_engine setup with rollback-journal SQLite
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers keep going while the scheduler threads write;
+    # NORMAL only fsyncs at checkpoints, which is safe under WAL
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def build_engine(url=DATABASE_URL, profile=DB_PROFILE):
+    """Create the engine for ``url`` using the given connection profile."""
+    is_sqlite = url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in url or url.rstrip("/") == "sqlite:")
+    if profile != "production" or in_memory:
+        return create_engine(url, connect_args={"check_same_thread": False} if is_sqlite else {})
+
+    if is_sqlite:
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    # Server databases (PostgreSQL): drop connections the server or a proxy
+    # closed, and recycle before typical idle timeouts
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+    )
+
+
+def async_database_url(url=DATABASE_URL):
+    """``url`` with its driver swapped for the async one (postgresql+psycopg2 -> postgresql+asyncpg)."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver known for {backend!r} databases; set ASYNC_DATABASE_URL")
+    return u.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def build_async_engine(url=None, profile=DB_PROFILE):
+    """Async counterpart of build_engine, with the same profile settings."""
+    url = url or ASYNC_DATABASE_URL or async_database_url()
+    is_sqlite = url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in url or url.split("://", 1)[1].strip("/") == "")
+    if profile != "production" or in_memory:
+        return create_async_engine(url)
+
+    if is_sqlite:
+        engine = create_async_engine(
+            url,
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+    )
+
+
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+metrics.instrument_engine(engine)
 Base = declarative_base()
 
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """The AsyncEngine, created on first use so the sync app imports even without an async driver."""
+    global _async_engine
+    with _async_engine_lock:
+        if _async_engine is None:
+            _async_engine = build_async_engine()
+            metrics.instrument_engine(_async_engine.sync_engine)
+        return _async_engine
+
+
+class _LazyAsyncSessionmaker:
+    """async_sessionmaker bound to get_async_engine() when the first session is made."""
+
+    def __init__(self, **kw):
+        self._kw = kw
+        self._factory = None
+
+    def __call__(self, **local_kw):
+        if self._factory is None:
+            self._factory = async_sessionmaker(bind=get_async_engine(), **self._kw)
+        return self._factory(**local_kw)
+
+
+AsyncSessionLocal = _LazyAsyncSessionmaker(autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession for ``async def`` endpoints."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 
 def init_db():
     from backend import models
+    from backend.migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
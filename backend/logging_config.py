@@ -0,0 +1,158 @@
+"""Application logging: structured records written off the request path.
+
+configure_logging() routes every record through a bounded in-memory queue to
+a QueueListener thread, which does the formatting and stdout I/O. Emitting a
+record never blocks the caller; if the queue is full the record is dropped and
+counted in ``log_records_dropped_total`` on /metrics.
+
+Settings:
+
+* LOG_LEVEL   -- root level (default INFO)
+* LOG_LEVELS  -- per-logger overrides, e.g.
+  ``backend.services.imap_service=DEBUG,sqlalchemy.engine=WARNING``
+* LOG_FORMAT  -- ``json`` (one object per line, default) or ``text``
+* LOG_QUEUE_SIZE -- records buffered before dropping (default 10000)
+
+Extra fields passed as ``logger.info("msg", extra={...})`` become keys of the
+JSON object (or ``key=value`` pairs in text). Hot paths should log aggregates,
+or use SampledLog to emit one record per N events.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from backend.services.metrics import Counter
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+log_records_dropped = Counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            first, sep, rest = line.partition("\n")
+            line = first + " " + " ".join(f"{k}={v}" for k, v in fields.items()) + sep + rest
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Resolve args and the traceback now (they may not survive the thread
+        # hop) but keep them apart so the formatter can still structure them
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+def parse_levels(spec):
+    """``"a=DEBUG,b.c=WARNING"`` -> ``{"a": "DEBUG", "b.c": "WARNING"}``."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging():
+    """Install the queue-backed root handler. Safe to call more than once."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+        records = queue.Queue(LOG_QUEUE_SIZE)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_DroppingQueueHandler(records))
+        root.setLevel(LOG_LEVEL)
+        for name, level in parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class SampledLog:
+    """Emit one record per ``every`` calls, carrying how many calls it stands for.
+
+    For events too frequent to log individually, e.g. one per processed reply.
+    """
+
+    def __init__(self, logger, every):
+        self.logger = logger
+        self.every = max(1, every)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def log(self, level, msg, **fields):
+        with self._lock:
+            self._count += 1
+            if self._count < self.every:
+                return
+            count, self._count = self._count, 0
+        self.logger.log(level, msg, extra={"sampled_count": count, **fields})
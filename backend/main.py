@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.database import init_db
-from backend.routers import consultants, tasks, dashboard, Updates, Scheduler, classification, reply,leave_updates
-from backend.services.scheduler import start_scheduler
+from backend.logging_config import configure_logging
+from backend.routers import consultants, tasks, dashboard, Updates, Scheduler, classification, reply,leave_updates, outbox, metrics, changes
+from backend.services.metrics import MetricsMiddleware
+from backend.services.scheduler import scheduler_leader
+from backend.utils.query_profiler import QUERY_PROFILE, QueryProfilerMiddleware
+
+configure_logging()
 
 app = FastAPI(title='AI Project Manager')
 
@@ -13,13 +18,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  
     allow_headers=["*"],  
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "X-Change-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
+if QUERY_PROFILE != "off":
+    # development/CI only: flag N+1 and slow queries per request
+    app.add_middleware(QueryProfilerMiddleware, mode=QUERY_PROFILE)
 
 @app.on_event('startup')
 def startup_event():
     init_db()
-    # start scheduler
-    start_scheduler(app)
+    # start the scheduler in whichever worker wins the scheduler lease
+    scheduler_leader.start()
+
+@app.on_event('shutdown')
+def shutdown_event():
+    scheduler_leader.stop()
 
 # Include routers
 app.include_router(consultants.router)
@@ -30,6 +44,9 @@ app.include_router(Scheduler.router)
 app.include_router(classification.router)
 app.include_router(reply.router)
 app.include_router(leave_updates.router)
+app.include_router(outbox.router)
+app.include_router(metrics.router)
+app.include_router(changes.router)
 
 @app.get('/')
 def root():
@@ -0,0 +1,81 @@
+"""Versioned schema migrations.
+
+``Base.metadata.create_all`` builds a fresh database from models.py but never
+changes tables that already exist, so indexes added to the models later have
+to reach existing databases through a migration. Each entry in MIGRATIONS is
+applied once, in order, and recorded in the ``schema_migrations`` table.
+Steps must be idempotent (IF [NOT] EXISTS, or add_column) because on a fresh
+database create_all has already built the same objects.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+
+def add_column(table, column, ddl):
+    """Migration step adding ``column`` to ``table`` unless it is already there."""
+    def step(conn):
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return step
+
+
+MIGRATIONS = [
+    (1, "Indexes for dashboard, updates, leave updates and send-mail queries", [
+        "CREATE INDEX IF NOT EXISTS ix_assignments_task_id ON assignments (task_id)",
+        "CREATE INDEX IF NOT EXISTS ix_assignments_consultant_id ON assignments (consultant_id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_end_date ON tasks (end_date)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_last_updated_at ON tasks (last_updated_at)",
+        "DROP INDEX IF EXISTS ix_tasks_status",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_last_updated_at ON tasks (status, last_updated_at)",
+        "CREATE INDEX IF NOT EXISTS ix_email_messages_thread_id ON email_messages (thread_id)",
+        "CREATE INDEX IF NOT EXISTS ix_email_messages_linked_task_id ON email_messages (linked_task_id)",
+        "CREATE INDEX IF NOT EXISTS ix_status_updates_created_at_id ON status_updates (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_status_updates_intent_reply_sent_created_at"
+        " ON status_updates (intent, reply_sent, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_status_updates_task_consultant_intent"
+        " ON status_updates (task_id, consultant_id, intent, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_status_updates_consultant_created_at"
+        " ON status_updates (consultant_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_performance_reports_week_consultant"
+        " ON performance_reports (week_start, week_end, consultant_id)",
+    ]),
+    (2, "Persisted reminder schedule for the reminder sweeper", [
+        add_column("task_reminders", "next_run_at", "DATETIME"),
+        add_column("task_reminders", "last_sent_at", "DATETIME"),
+        "CREATE INDEX IF NOT EXISTS ix_task_reminders_active_next_run ON task_reminders (is_active, next_run_at)",
+    ]),
+    (3, "Reply threading: outbound Message-IDs and task name lookup", [
+        add_column("email_outbox", "message_id", "VARCHAR"),
+        "CREATE INDEX IF NOT EXISTS ix_tasks_name ON tasks (name)",
+    ]),
+]
+
+
+def current_version(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR, applied_at TIMESTAMP)"
+    ))
+    return conn.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+
+
+def run_migrations(engine):
+    """Apply every migration newer than the database's recorded version."""
+    with engine.begin() as conn:
+        version = current_version(conn)
+        for number, description, statements in MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info(f"Applying migration {number}: {description}")
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": number, "d": description, "t": datetime.utcnow()}
+            )
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, DateTime,Time, Text, ForeignKey, Table, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime,Time, Text, ForeignKey, Table, Enum, Boolean, Index, BigInteger
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -12,11 +12,17 @@ class StatusEnum(str, enum.Enum):
     BLOCKED = "Blocked"
     DONE = "Done"
  
+class OutboxStatusEnum(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+ 
 assignment_table = Table(
     'assignments', Base.metadata,
     Column('id', Integer, primary_key=True, index=True),
-    Column('task_id', Integer, ForeignKey('tasks.id')),
-    Column('consultant_id', Integer, ForeignKey('consultants.id'))
+    Column('task_id', Integer, ForeignKey('tasks.id'), index=True),
+    Column('consultant_id', Integer, ForeignKey('consultants.id'), index=True)
 )
  
 class Consultant(Base):
@@ -30,18 +36,21 @@ class Consultant(Base):
 class Task(Base):
     __tablename__ = 'tasks'
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)  # inbound [Task: name] subject fallback
     description = Column(Text, nullable=True)
     start_date = Column(DateTime, nullable=True)
-    end_date = Column(DateTime, nullable=True)
+    end_date = Column(DateTime, nullable=True, index=True)
     status = Column(Enum(StatusEnum), default=StatusEnum.NOT_STARTED)
     status_pct = Column(Integer, default=0)
-    last_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    last_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
  
     consultants = relationship('Consultant', secondary=assignment_table, back_populates='assignments')
     status_updates = relationship('StatusUpdate', back_populates='task')
     reminders = relationship("TaskReminder", back_populates="task")
  
+    # status alone is served by the leading column of this index
+    __table_args__ = (Index('ix_tasks_status_last_updated_at', 'status', 'last_updated_at'),)
+ 
 class EmailMessage(Base):
     __tablename__ = 'email_messages'
     id = Column(Integer, primary_key=True, index=True)
@@ -52,8 +61,8 @@ class EmailMessage(Base):
     sender = Column(String)
     recipients = Column(Text)  
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
-    thread_id = Column(String, nullable=True)
-    linked_task_id = Column(Integer, ForeignKey('tasks.id'), nullable=True)
+    thread_id = Column(String, nullable=True, index=True)
+    linked_task_id = Column(Integer, ForeignKey('tasks.id'), nullable=True, index=True)
     linked_consultant_id = Column(Integer, ForeignKey('consultants.id'), nullable=True)
  
 class StatusUpdate(Base):
@@ -74,6 +83,17 @@ class StatusUpdate(Base):
  
     task = relationship('Task', back_populates='status_updates')
  
+    __table_args__ = (
+        # /updates keyset pages: ORDER BY created_at, id
+        Index('ix_status_updates_created_at_id', 'created_at', 'id'),
+        # /leave-updates: intent = 'leave' AND reply_sent = ?, same ordering
+        Index('ix_status_updates_intent_reply_sent_created_at', 'intent', 'reply_sent', 'created_at', 'id'),
+        # /reply/send-mail: latest leave update for a task and consultant
+        Index('ix_status_updates_task_consultant_intent', 'task_id', 'consultant_id', 'intent', 'created_at'),
+        # weekly report: updates per consultant within the week
+        Index('ix_status_updates_consultant_created_at', 'consultant_id', 'created_at'),
+    )
+ 
 class PerformanceReport(Base):
     __tablename__ = 'performance_reports'
     id = Column(Integer, primary_key=True, index=True)
@@ -84,6 +104,8 @@ class PerformanceReport(Base):
     tasks_summary_json = Column(Text)
     score = Column(Integer, default=0)
     emailed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index('ix_performance_reports_week_consultant', 'week_start', 'week_end', 'consultant_id'),)
  
 class SchedulerConfig(Base):
     __tablename__ = "scheduler_config"
@@ -100,5 +122,53 @@ class TaskReminder(Base):
     reminder_time = Column(Time, nullable=False)  
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    next_run_at = Column(DateTime, nullable=True)  # UTC; None once the task's end date has passed
+    last_sent_at = Column(DateTime, nullable=True)
     task = relationship("Task", back_populates="reminders")
- 
\ No newline at end of file
+ 
+    __table_args__ = (Index('ix_task_reminders_active_next_run', 'is_active', 'next_run_at'),)
+ 
+class OutboxEmail(Base):
+    __tablename__ = 'email_outbox'
+    id = Column(Integer, primary_key=True, index=True)
+    email_message_id = Column(Integer, ForeignKey('email_messages.id'), nullable=True)
+    subject = Column(String)
+    body_text = Column(Text)
+    html_body = Column(Text, nullable=True)
+    recipients = Column(Text, nullable=False)
+    status = Column(Enum(OutboxStatusEnum), default=OutboxStatusEnum.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String, nullable=True)
+    message_id = Column(String, nullable=True)  # Message-ID header we assign, for reply threading
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # while 'sending': claim expiry
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+ 
+    __table_args__ = (Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),)
+ 
+class LeaderLease(Base):
+    __tablename__ = 'leader_leases'
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+ 
+class ImapSyncState(Base):
+    __tablename__ = 'imap_sync_state'
+    mailbox = Column(String, primary_key=True)
+    # UIDVALIDITY and UIDs are unsigned 32-bit values
+    uid_validity = Column(BigInteger, nullable=False)
+    last_uid = Column(BigInteger, nullable=False, default=0)  # highest UID already ingested
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Change(Base):
+    """One row per committed Task/StatusUpdate write; the id is the change feed cursor."""
+    __tablename__ = 'changes'
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # "task" | "status_update"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # insert | update | delete
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # AUTOINCREMENT: SQLite must never hand out a pruned id again
+    __table_args__ = (Index('ix_changes_entity_id', 'entity', 'id'), {'sqlite_autoincrement': True})
@@ -1,66 +1,91 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend.database import SessionLocal
+from backend.database import get_async_db
 from backend.schemas import UpdateOut
 from backend.models import StatusUpdate, Task, Consultant
-import traceback
+from backend.utils.pagination import keyset_page_async, set_cursor_headers, stream_rows
+from backend.services.change_feed import (
+    CURSOR_SUPPORTED, CURSOR_UNSUPPORTED_DETAIL, changed_ids_async, current_cursor_async, set_change_cursor
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/updates", tags=["updates"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def build_updates_query():
+    return select(
+        StatusUpdate.id,
+        Consultant.name.label("consultant_name"),
+        Consultant.email.label("consultant_email"),
+        Task.name.label("task_name"),
+        StatusUpdate.status_label,
+        StatusUpdate.status_pct,
+        StatusUpdate.blockers,
+        StatusUpdate.eta_date,
+        StatusUpdate.created_at,
+        StatusUpdate.summary,
+        StatusUpdate.sentiment,
+        StatusUpdate.reply_sent
+    ).outerjoin(
+        Task, StatusUpdate.task_id == Task.id
+    ).outerjoin(
+        Consultant, StatusUpdate.consultant_id == Consultant.id
+    )
+
+def update_to_dict(update):
+    return {
+        "id": update[0],
+        "consultant_name": update[1] if update[1] else None,
+        "consultant_email": update[2] if update[2] else None,
+        "task_name": update[3] if update[3] else None,
+        "status_label": update[4] if update[4] else "Not Started",
+        "status_pct": update[5] if update[5] else 0,
+        "blockers": update[6] if update[6] else "None",
+        "eta_date": update[7] if update[7] else "N/A",
+        "created_at": update[8].isoformat() if update[8] else None,
+        "summary": update[9] if update[9] else None,
+        "sentiment": update[10] if update[10] else None,
+        "state": update[11] if update[11] else 0
+    }
 
 @router.get("/", response_model=List[UpdateOut])
-async def get_updates(db: Session = Depends(get_db)):
+async def get_updates(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(100, ge=1, le=1000, description="Page size (ignored when streaming)"),
+    before: Optional[int] = Query(None, description="Cursor: return updates older than this update id"),
+    after: Optional[int] = Query(None, description="Cursor: return updates newer than this update id"),
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="Stream every matching update as a JSON array or NDJSON"),
+    since: Optional[int] = Query(None, ge=0, description="Change cursor from X-Change-Cursor: only updates created or modified after it")
+):
+    if since is not None and not CURSOR_SUPPORTED:
+        raise HTTPException(status_code=501, detail=CURSOR_UNSUPPORTED_DETAIL)
     try:
-        updates_query = db.query(
-            StatusUpdate.id,
-            Consultant.name.label("consultant_name"),
-            Consultant.email.label("consultant_email"),
-            Task.name.label("task_name"),
-            StatusUpdate.status_label,
-            StatusUpdate.status_pct,
-            StatusUpdate.blockers,
-            StatusUpdate.eta_date,
-            StatusUpdate.created_at,
-            StatusUpdate.summary,
-            StatusUpdate.sentiment,
-            StatusUpdate.reply_sent
-        ).outerjoin(
-            Task, StatusUpdate.task_id == Task.id
-        ).outerjoin(
-            Consultant, StatusUpdate.consultant_id == Consultant.id
-        ).order_by(StatusUpdate.created_at.desc())
-        updates = updates_query.all()
-        print("Number of updates:", len(updates)) 
-        for update in updates:
-            print("Update:", update)  
-        result = []
-        for update in updates:
-            result.append({
-                "id": update[0],
-                "consultant_name": update[1] if update[1] else None,
-                "consultant_email": update[2] if update[2] else None,
-                "task_name": update[3] if update[3] else None,
-                "status_label": update[4] if update[4] else "Not Started",
-                "status_pct": update[5] if update[5] else 0,
-                "blockers": update[6] if update[6] else "None",
-                "eta_date": update[7] if update[7] else "N/A",
-                "created_at": update[8].isoformat() if update[8] else None, 
-                "summary": update[9] if update[9] else None,
-                "sentiment": update[10] if update[10] else None,
-                "state": update[11] if update[11] else 0
-            })
-        return result
+        if since is not None:
+            ids, cursor = await changed_ids_async(db, "status_update", since, limit)
+            updates = (await db.execute(
+                build_updates_query().where(StatusUpdate.id.in_(ids))
+                .order_by(StatusUpdate.created_at.desc(), StatusUpdate.id.desc())
+            )).all() if ids else []
+            set_change_cursor(response, cursor)
+            return [update_to_dict(update) for update in updates]
+
+        # read before the rows, so a delta from it can't miss a write made meanwhile
+        change_cursor = await current_cursor_async(db)
+        if stream:
+            streamed = stream_rows(build_updates_query(), StatusUpdate, update_to_dict, stream, before=before, after=after)
+            set_change_cursor(streamed, change_cursor)
+            return streamed
+        updates, next_cursor, prev_cursor = await keyset_page_async(
+            db, build_updates_query(), StatusUpdate, limit, before=before, after=after
+        )
+        set_cursor_headers(response, next_cursor, prev_cursor)
+        set_change_cursor(response, change_cursor)
+        return [update_to_dict(update) for update in updates]
     except Exception as e:
-        print("Error fetching updates:", e)
-        import traceback
-        print(traceback.format_exc())
+        logger.exception(f"Error fetching updates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-
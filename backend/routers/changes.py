@@ -0,0 +1,105 @@
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import get_async_db
+from backend.models import StatusUpdate, Task
+from backend.routers.Updates import build_updates_query, update_to_dict
+from backend.services import change_feed
+
+logger = logging.getLogger(__name__)
+
+
+def require_cursor_support():
+    if not change_feed.CURSOR_SUPPORTED:
+        raise HTTPException(status_code=501, detail=change_feed.CURSOR_UNSUPPORTED_DETAIL)
+
+
+router = APIRouter(prefix="/changes", tags=["changes"], dependencies=[Depends(require_cursor_support)])
+
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
+
+
+def change_to_dict(change):
+    return {
+        "cursor": change.id,
+        "entity": change.entity,
+        "id": change.entity_id,
+        "op": change.op,
+        "changed_at": change.changed_at,
+    }
+
+
+async def load_events(db, changes):
+    """(cursor, event, data) per change, with the current row for anything not deleted.
+
+    Status updates carry the /updates/ fields plus intent and task_id, so a
+    client can place them in the task or leave list; tasks carry their status.
+    """
+    update_ids = {c.entity_id for c in changes if c.entity == "status_update" and c.op != "delete"}
+    task_ids = {c.entity_id for c in changes if c.entity == "task" and c.op != "delete"}
+    rows = {}
+    if update_ids:
+        query = build_updates_query().add_columns(StatusUpdate.intent, StatusUpdate.task_id)
+        for row in (await db.execute(query.where(StatusUpdate.id.in_(update_ids)))).all():
+            rows["status_update", row[0]] = {**update_to_dict(row), "intent": row[12], "task_id": row[13]}
+    if task_ids:
+        query = select(Task.id, Task.name, Task.status, Task.status_pct, Task.last_updated_at)
+        for row in (await db.execute(query.where(Task.id.in_(task_ids)))).all():
+            rows["task", row.id] = {
+                "id": row.id,
+                "name": row.name,
+                "status": row.status,
+                "status_pct": row.status_pct,
+                "last_updated_at": row.last_updated_at,
+            }
+    return [
+        (c.id, c.entity, {"op": c.op, **rows.get((c.entity, c.entity_id), {"id": c.entity_id})})
+        for c in changes
+    ]
+
+
+feed = change_feed.ChangeFeed(load_events)
+
+
+@router.get("/")
+async def list_changes(
+    db: AsyncSession = Depends(get_async_db),
+    since: int = Query(0, ge=0, description="Cursor: return changes after this one"),
+    limit: int = Query(500, ge=1, le=change_feed.CHANGE_FEED_BATCH)
+):
+    """Raw change entries after ``since``, deletions included, with the cursor to resume from."""
+    changes = await change_feed.changes_after(db, since, limit)
+    cursor = changes[-1].id if changes else max(since, await change_feed.current_cursor_async(db))
+    return {"cursor": cursor, "changes": [change_to_dict(c) for c in changes]}
+
+
+def _sse(cursor, event, data):
+    return f"id: {cursor}\nevent: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.get("/stream")
+async def stream_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor to resume from (default: only new changes)"),
+    last_event_id: Optional[int] = Header(None, description="Sent by EventSource when it reconnects")
+):
+    """Server-Sent Events: one ``task`` or ``status_update`` event per change, ``id`` being its cursor."""
+    start = last_event_id if last_event_id is not None else since
+
+    async def generate():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        async for item in feed.subscribe(start, heartbeat=SSE_HEARTBEAT_SECONDS):
+            yield ": keep-alive\n\n" if item is None else _sse(*item)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
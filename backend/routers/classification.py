@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-import re
-from typing import Optional
+from typing import List, Optional
 from backend.database import SessionLocal
 from backend import models
+from backend.services.extraction import extract_reply, determine_status_label
+from backend.services import lookup_cache
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import logging
+import os
+from backend.logging_config import SampledLog
  
 router = APIRouter(prefix="/tasks", tags=["tasks"])
  
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# one line per REPLY_LOG_SAMPLE replies instead of one per request
+reply_log = SampledLog(logger, int(os.getenv("REPLY_LOG_SAMPLE", 100)))
  
 class ProcessReplyRequest(BaseModel):
     task_id: int
@@ -18,6 +22,8 @@ class ProcessReplyRequest(BaseModel):
     email_subject: str
     email_body: str
  
+MAX_BATCH_REPLIES = 1000
+ 
 def get_db():
     db = SessionLocal()
     try:
@@ -25,98 +31,45 @@ def get_db():
     finally:
         db.close()
  
-def classify_intent(body: str) -> str:
-    body_lower = body.lower()
-    if any(word in body_lower for word in ["ooo", "vacation", "sick", "leave"]):
-        return "leave"
-    if any(word in body_lower for word in ["progress", "complete", "blocked", "eta", "%", "update"]):
-        return "update"
-    return "other"
- 
-def extract_percent_complete(body: str) -> Optional[int]:
-    match = re.search(r"(\d{1,3})\s*%[\s\w]*complete", body, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    match = re.search(r"(\d{1,3})\s*%", body)
-    if match:
-        return int(match.group(1))
-    return None
- 
-def extract_eta(body: str) -> Optional[str]:
-    match = re.search(r"eta[:\s\-]*([0-9]{4}-[0-9]{2}-[0-9]{2})", body, re.IGNORECASE)
-    if match:
-        return match.group(1)
-    return None
- 
-def extract_blockers(body: str) -> Optional[str]:
-    match = re.search(r"blocked by ([^\.\n]+)", body, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    return None
- 
-def extract_absence(body: str) -> Optional[str]:
-    match = re.search(r"on leave from ([0-9\-]+) to ([0-9\-]+)(?: due to ([\w\s]+))?", body, re.IGNORECASE)
-    if match:
-        start, end, reason = match.groups()
-        return f"On leave {start} to {end}" + (f" ({reason.strip()})" if reason else "")
-    return None
- 
-def summarize_reply(body: str) -> str:
-    percent = extract_percent_complete(body)
-    blockers = extract_blockers(body)
-    eta = extract_eta(body)
-    absence = extract_absence(body)
-    summary_parts = []
-    if percent is not None:
-        summary_parts.append(f"{percent}% complete")
-    if blockers:
-        summary_parts.append(f"Blocked by {blockers}")
-    if eta:
-        summary_parts.append(f"ETA: {eta}")
-    if absence:
-        summary_parts.append(absence)
-    return ". ".join(summary_parts) + ("." if summary_parts else "")
- 
-def determine_status_label(intent: str, percent_complete: Optional[int], blockers: Optional[str]) -> str:
-    if percent_complete is not None:
-        if percent_complete == 0:
-            return "Not Started"
-        elif percent_complete == 100:
-            return "Completed"
-        else:
-            return "In Progress"
+ 
+def apply_progress(task, percent_complete: Optional[int], blockers: Optional[str]):
+    if percent_complete is None:
+        return
+    task.status_pct = percent_complete
+    if percent_complete == 0:
+        task.status = models.StatusEnum.NOT_STARTED
+    elif percent_complete == 100:
+        task.status = models.StatusEnum.DONE
     elif blockers:
-        return "Blocked"
-    elif intent == "leave":
-        return "On Leave"
-    elif intent == "update":
-        return "In Progress"
+        task.status = models.StatusEnum.BLOCKED
     else:
-        return "Unknown"
+        task.status = models.StatusEnum.IN_PROGRESS
  
  
 @router.post("/process-reply")
 def process_reply(payload: ProcessReplyRequest, db=Depends(get_db)):
-    logger.info(f"Processing reply for task_id={payload.task_id}, consultant={payload.consultant_email}")
+    logger.debug(f"Processing reply for task_id={payload.task_id}, consultant={payload.consultant_email}")
     try:
         # 1. Validate task and consultant
-        task = db.query(models.Task).filter(models.Task.id == payload.task_id).first()
+        # The task is written below, so it is loaded rather than taken from the cache
+        task = db.get(models.Task, payload.task_id)
         if not task:
             logger.error(f"Task with id {payload.task_id} not found")
             raise HTTPException(status_code=404, detail="Task not found")
-        consultant = db.query(models.Consultant).filter_by(email=payload.consultant_email).first()
-        if not consultant:
+        consultant_id = lookup_cache.get_consultant_ids(db, [payload.consultant_email]).get(payload.consultant_email)
+        if consultant_id is None:
             logger.error(f"Consultant with email {payload.consultant_email} not found")
             raise HTTPException(status_code=404, detail="Consultant not found")
  
         # 2. Extract classification data
-        intent = classify_intent(payload.email_body)
-        percent_complete = extract_percent_complete(payload.email_body)
-        eta_date = extract_eta(payload.email_body)
-        blockers = extract_blockers(payload.email_body)
-        summary = summarize_reply(payload.email_body)
+        fields = extract_reply(payload.email_body)
+        intent = fields["intent"]
+        percent_complete = fields["percent_complete"]
+        eta_date = fields["eta_date"]
+        blockers = fields["blockers"]
+        summary = fields["summary"]
         absence_detected = intent == "leave"
-        status_label = determine_status_label(intent, percent_complete, blockers)
+        status_label = fields["status_label"]
  
         # 3. Create EmailMessage record
         email_message = models.EmailMessage(
@@ -128,7 +81,7 @@ def process_reply(payload: ProcessReplyRequest, db=Depends(get_db)):
             recipients=None,
             thread_id=None,
             linked_task_id=task.id,
-            linked_consultant_id=consultant.id
+            linked_consultant_id=consultant_id
         )
         db.add(email_message)
         db.flush()  # Get email_message.id
@@ -136,7 +89,7 @@ def process_reply(payload: ProcessReplyRequest, db=Depends(get_db)):
         # 4. Create StatusUpdate record
         status_update = models.StatusUpdate(
             task_id=task.id,
-            consultant_id=consultant.id,
+            consultant_id=consultant_id,
             intent=intent,
             status_pct=percent_complete,
             status_label=status_label,
@@ -149,22 +102,14 @@ def process_reply(payload: ProcessReplyRequest, db=Depends(get_db)):
         db.add(status_update)
  
         # 5. Update Task if progress provided
-        if percent_complete is not None:
-            task.status_pct = percent_complete
-            if percent_complete == 0:
-                task.status = models.StatusEnum.NOT_STARTED
-            elif percent_complete == 100:
-                task.status = models.StatusEnum.DONE
-            elif blockers:
-                task.status = models.StatusEnum.BLOCKED
-            else:
-                task.status = models.StatusEnum.IN_PROGRESS
+        apply_progress(task, percent_complete, blockers)
  
         db.commit()
         db.refresh(email_message)
         db.refresh(status_update)
  
-        logger.info(f"Reply processed: email_id={email_message.id}, status_update_id={status_update.id}")
+        logger.debug(f"Reply processed: email_id={email_message.id}, status_update_id={status_update.id}")
+        reply_log.log(logging.INFO, "Replies processed", last_status_update_id=status_update.id)
  
         return {
             "intent": intent,
@@ -195,4 +140,104 @@ def process_reply(payload: ProcessReplyRequest, db=Depends(get_db)):
         logger.error(f"Unexpected error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
  
- 
\ No newline at end of file
+ 
+@router.post("/process-replies")
+def process_replies(payload: List[ProcessReplyRequest], db=Depends(get_db)):
+    """Process many replies in one transaction.
+
+    Tasks and consultants are resolved with one IN query each, EmailMessage and
+    StatusUpdate rows are bulk-inserted, and the whole batch commits once.
+    Replies whose task or consultant is unknown are reported per item and skipped.
+    """
+    if len(payload) > MAX_BATCH_REPLIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REPLIES} replies per batch")
+    logger.info(f"Processing batch of {len(payload)} replies")
+    try:
+        # 1. Resolve all tasks and consultants up front
+        task_ids = {r.task_id for r in payload}
+        emails = {r.consultant_email for r in payload}
+        tasks = {t.id: t for t in db.query(models.Task).filter(models.Task.id.in_(task_ids))} if task_ids else {}
+        consultants = {
+            c.email: c for c in db.query(models.Consultant).filter(models.Consultant.email.in_(emails))
+        } if emails else {}
+
+        # 2. Extract and build EmailMessage records for every valid reply
+        results = [None] * len(payload)
+        accepted = []
+        for index, reply in enumerate(payload):
+            task = tasks.get(reply.task_id)
+            consultant = consultants.get(reply.consultant_email)
+            if not task or not consultant:
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "detail": "Task not found" if not task else "Consultant not found"
+                }
+                continue
+            email_message = models.EmailMessage(
+                external_message_id=None,
+                direction='inbound',
+                subject=reply.email_subject,
+                body_text=reply.email_body,
+                sender=reply.consultant_email,
+                recipients=None,
+                thread_id=None,
+                linked_task_id=task.id,
+                linked_consultant_id=consultant.id
+            )
+            accepted.append((index, task, consultant, extract_reply(reply.email_body), email_message))
+        db.add_all([item[4] for item in accepted])
+        db.flush()  # Get email_message ids
+
+        # 3. Build StatusUpdate records and apply task progress in submission order
+        status_updates = []
+        for index, task, consultant, fields, email_message in accepted:
+            status_updates.append(models.StatusUpdate(
+                task_id=task.id,
+                consultant_id=consultant.id,
+                intent=fields["intent"],
+                status_pct=fields["percent_complete"],
+                status_label=fields["status_label"],
+                summary=fields["summary"] if fields["summary"] else None,
+                blockers=fields["blockers"],
+                eta_date=fields["eta_date"],
+                sentiment=None,
+                source_email_id=email_message.id
+            ))
+            apply_progress(task, fields["percent_complete"], fields["blockers"])
+        db.add_all(status_updates)
+        db.flush()  # Get status_update ids
+
+        # Read ids before commit so building the response doesn't reload every row
+        for (index, task, consultant, fields, email_message), status_update in zip(accepted, status_updates):
+            results[index] = {
+                "index": index,
+                "status": "ok",
+                "intent": fields["intent"],
+                "percent_complete": fields["percent_complete"],
+                "eta_date": fields["eta_date"],
+                "blockers": fields["blockers"],
+                "summary": fields["summary"],
+                "absence_detected": fields["intent"] == "leave",
+                "status_label": fields["status_label"],
+                "email_message_id": email_message.id,
+                "status_update_id": status_update.id,
+                "task_updated": fields["percent_complete"] is not None
+            }
+        db.commit()
+
+        logger.info(f"Reply batch processed: {len(accepted)} stored, {len(payload) - len(accepted)} rejected")
+        return {"processed": len(accepted), "failed": len(payload) - len(accepted), "results": results}
+
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Database integrity error: {e}")
+        raise HTTPException(status_code=400, detail="Database integrity constraint violated")
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Unexpected error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from backend import schemas
 from backend.database import SessionLocal
 from backend import models
+from backend.services import lookup_cache
 
 router = APIRouter(prefix="/consultants", tags=["consultants"])
 
@@ -15,7 +16,7 @@ def get_db():
 
 @router.post("/", response_model=schemas.ConsultantOut)
 def create_consultant(consultant: schemas.ConsultantCreate, db=Depends(get_db)):
-    existing = db.query(models.Consultant).filter(models.Consultant.email == consultant.email).first()
+    existing = lookup_cache.get_consultant_by_email(db, consultant.email)
     if existing:
         raise HTTPException(status_code=400, detail="Consultant with this email already exists")
     c = models.Consultant(
@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, select, union
+from fastapi import APIRouter, Depends, Response
 from pydantic import BaseModel
 from backend.database import SessionLocal
 from backend.models import Task, StatusEnum
 from backend.schemas import TaskSummary, DashboardSummary
+from backend.services import change_feed, dashboard_cache
 
 def get_db():
     db = SessionLocal()
@@ -19,49 +20,51 @@ def get_dashboard_summary(db: Session):
     forty_eight_hours_ago = now - timedelta(hours=48)
     week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # Fetch overdue tasks with names and assignees
-    overdue_tasks = db.query(Task).filter(
-        and_(
-            Task.status != StatusEnum.DONE,
-            Task.end_date < now.date()
-        )
-    ).all()
+    overdue = and_(Task.status != StatusEnum.DONE, Task.end_date < now.date())
+    no_update = and_(Task.status != StatusEnum.DONE, Task.last_updated_at < forty_eight_hours_ago)
+    at_risk = Task.status == StatusEnum.BLOCKED
+    done_this_week = and_(Task.status == StatusEnum.DONE, Task.last_updated_at >= week_start)
 
-    # Fetch tasks with no update in 48 hours
-    no_update_tasks = db.query(Task).filter(
-        and_(
-            Task.status != StatusEnum.DONE,
-            Task.last_updated_at < forty_eight_hours_ago
-        )
-    ).all()
+    # Ids of tasks in any bucket; a UNION lets each branch use its own index
+    # where an OR across the buckets would make SQLite scan the whole table
+    bucket_ids = union(*(select(Task.id).where(bucket) for bucket in (overdue, no_update, at_risk, done_this_week)))
 
-    # Fetch at-risk (blocked) tasks
-    at_risk_tasks = db.query(Task).filter(
-        Task.status == StatusEnum.BLOCKED
-    ).all()
-
-    # Fetch tasks done this week
-    done_this_week_tasks = db.query(Task).filter(
-        and_(
-            Task.status == StatusEnum.DONE,
-            Task.last_updated_at >= week_start
-        )
-    ).all()
+    # Fetch every task in any bucket in one pass, flagging which buckets it
+    # belongs to, with assignees eager-loaded in a single extra query
+    rows = db.query(
+        Task,
+        overdue.label("overdue"),
+        no_update.label("no_update"),
+        at_risk.label("at_risk"),
+        done_this_week.label("done"),
+    ).options(
+        selectinload(Task.consultants)
+    ).filter(
+        Task.id.in_(bucket_ids)
+    ).order_by(Task.id).all()
 
     # Helper function to extract task name and assignee names
     def task_to_summary(task):
         assignee_names = [consultant.name for consultant in task.consultants]
         return TaskSummary(task_name=task.name, assignees=assignee_names)
 
-    return {
-        "overdue": [task_to_summary(task) for task in overdue_tasks],
-        "noUpdate": [task_to_summary(task) for task in no_update_tasks],
-        "atRisk": [task_to_summary(task) for task in at_risk_tasks],
-        "done": [task_to_summary(task) for task in done_this_week_tasks],
-    }
+    summary = {"overdue": [], "noUpdate": [], "atRisk": [], "done": []}
+    for task, is_overdue, is_no_update, is_at_risk, is_done in rows:
+        item = task_to_summary(task)
+        if is_overdue:
+            summary["overdue"].append(item)
+        if is_no_update:
+            summary["noUpdate"].append(item)
+        if is_at_risk:
+            summary["atRisk"].append(item)
+        if is_done:
+            summary["done"].append(item)
+    return summary
 
 router = APIRouter(prefix="/summary", tags=["summary"])
 
 @router.get("/dashboard", response_model=DashboardSummary)
-def dashboard_summary(db: Session = Depends(get_db)):
-    return get_dashboard_summary(db)
+def dashboard_summary(response: Response, db: Session = Depends(get_db)):
+    # a client re-fetches when /changes/stream reports a change after this cursor
+    change_feed.set_change_cursor(response, change_feed.current_cursor(db))
+    return dashboard_cache.get_or_compute(lambda: get_dashboard_summary(db))
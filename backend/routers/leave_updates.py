@@ -1,77 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend.database import SessionLocal
+from backend.database import get_async_db
 from backend.schemas import UpdateOut
 from backend.models import StatusUpdate, Task, Consultant
-import traceback
+from backend.utils.pagination import keyset_page_async, set_cursor_headers, stream_rows
+from backend.services.change_feed import (
+    CURSOR_SUPPORTED, CURSOR_UNSUPPORTED_DETAIL, changed_ids_async, current_cursor_async, set_change_cursor
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/leave-updates", tags=["leave-updates"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+def build_leave_updates_query(state: Optional[int] = None):
+    updates_query = select(
+        StatusUpdate.id,
+        Consultant.name.label("consultant_name"),
+        Consultant.email.label("consultant_email"),
+        Task.name.label("task_name"),
+        Task.id.label("task_id"),
+        StatusUpdate.status_label,
+        StatusUpdate.status_pct,
+        StatusUpdate.blockers,
+        StatusUpdate.eta_date,
+        StatusUpdate.created_at,
+        StatusUpdate.summary,
+        StatusUpdate.sentiment,
+        StatusUpdate.reply_sent
+    ).outerjoin(
+        Task, StatusUpdate.task_id == Task.id
+    ).outerjoin(
+        Consultant, StatusUpdate.consultant_id == Consultant.id
+    ).where(
+        StatusUpdate.intent == "leave"
+    )
+
+    if state is not None:
+        updates_query = updates_query.where(StatusUpdate.reply_sent == state)
+    return updates_query
+
+def leave_update_to_dict(update):
+    return {
+        "id": update[0],  # StatusUpdate.id
+        "consultant_name": update[1],
+        "consultant_email": update[2],
+        "task_name": update[3],
+        "task_id": update[4],  # Task.id (task_id)
+        "status_label": update[5] or "Not Started",
+        "status_pct": update[6] or 0,
+        "blockers": update[7] or "None",
+        "eta_date": update[8] or "N/A",
+        "created_at": update[9],
+        "summary": update[10],
+        "sentiment": update[11],
+        "state": update[12]
+    }
 
 @router.get("/", response_model=List[UpdateOut])
 async def get_leave_updates(
-    db: Session = Depends(get_db),
-    state: Optional[int] = Query(0, description="State value for further filtering (0 or 1)")
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    state: Optional[int] = Query(0, description="State value for further filtering (0 or 1)"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size (ignored when streaming)"),
+    before: Optional[int] = Query(None, description="Cursor: return updates older than this update id"),
+    after: Optional[int] = Query(None, description="Cursor: return updates newer than this update id"),
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="Stream every matching update as a JSON array or NDJSON"),
+    since: Optional[int] = Query(None, ge=0, description="Change cursor from X-Change-Cursor: only leave updates created or modified after it, whatever their state")
 ):
+    if since is not None and not CURSOR_SUPPORTED:
+        raise HTTPException(status_code=501, detail=CURSOR_UNSUPPORTED_DETAIL)
     try:
-        
-        updates_query = db.query(
-            StatusUpdate.id,
-            Consultant.name.label("consultant_name"),
-            Consultant.email.label("consultant_email"), 
-            Task.name.label("task_name"),
-            Task.id.label("task_id"), 
-            StatusUpdate.status_label,
-            StatusUpdate.status_pct,
-            StatusUpdate.blockers,
-            StatusUpdate.eta_date,
-            StatusUpdate.created_at,
-            StatusUpdate.summary,
-            StatusUpdate.sentiment,
-            StatusUpdate.reply_sent
-        ).outerjoin(
-            Task, StatusUpdate.task_id == Task.id
-        ).outerjoin(
-            Consultant, StatusUpdate.consultant_id == Consultant.id
-        ).filter(
-            StatusUpdate.intent == "leave"
-        ).order_by(StatusUpdate.created_at.desc())
-
-        if state is not None:
-            updates_query = updates_query.filter(StatusUpdate.reply_sent == state)
-
-        updates = updates_query.all()
-        print("Raw SQL query results:", updates) 
-
-        result = []
-        for update in updates:
-            result.append({
-                
-                "id": update[0],  # StatusUpdate.id
-                "consultant_name": update[1],
-                "consultant_email": update[2],
-                "task_name": update[3],
-                "task_id": update[4],  # Task.id (task_id)
-                "status_label": update[5] or "Not Started",
-                "status_pct": update[6] or 0,
-                "blockers": update[7] or "None",
-                "eta_date": update[8] or "N/A",
-                "created_at": update[9],
-                "summary": update[10],
-                "sentiment": update[11],
-                "state": update[12]
-            })
+        if since is not None:
+            # No state filter: an update whose state changed has to reach the
+            # client so it can move it out of its list
+            ids, cursor = await changed_ids_async(db, "status_update", since, limit)
+            updates = (await db.execute(
+                build_leave_updates_query().where(StatusUpdate.id.in_(ids))
+                .order_by(StatusUpdate.created_at.desc(), StatusUpdate.id.desc())
+            )).all() if ids else []
+            set_change_cursor(response, cursor)
+            return [leave_update_to_dict(update) for update in updates]
 
-        return result
+        change_cursor = await current_cursor_async(db)
+        if stream:
+            streamed = stream_rows(
+                build_leave_updates_query(state),
+                StatusUpdate, leave_update_to_dict, stream, before=before, after=after
+            )
+            set_change_cursor(streamed, change_cursor)
+            return streamed
+        updates, next_cursor, prev_cursor = await keyset_page_async(
+            db, build_leave_updates_query(state), StatusUpdate, limit, before=before, after=after
+        )
+        set_cursor_headers(response, next_cursor, prev_cursor)
+        set_change_cursor(response, change_cursor)
+        return [leave_update_to_dict(update) for update in updates]
 
     except Exception as e:
-        print("Error fetching leave updates:", e)
-        print(traceback.format_exc())
+        logger.exception(f"Error fetching leave updates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
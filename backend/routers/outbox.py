@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from backend.database import SessionLocal
+from backend.models import OutboxEmail, OutboxStatusEnum
+from backend.schemas import OutboxStatusOut
+
+router = APIRouter(prefix="/outbox", tags=["outbox"])
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/", response_model=List[OutboxStatusOut])
+def list_outbox(
+    db: Session = Depends(get_db),
+    status: Optional[OutboxStatusEnum] = Query(None, description="Filter by delivery status"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    query = db.query(OutboxEmail)
+    if status is not None:
+        query = query.filter(OutboxEmail.status == status)
+    return query.order_by(OutboxEmail.id.desc()).limit(limit).all()
+
+@router.get("/{outbox_id}", response_model=OutboxStatusOut)
+def get_outbox_status(outbox_id: int, db: Session = Depends(get_db)):
+    item = db.query(OutboxEmail).filter(OutboxEmail.id == outbox_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Outbox item not found")
+    return item
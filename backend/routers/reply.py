@@ -1,16 +1,14 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from backend.services.email_service import send_email
-from backend.models import EmailMessage as EmailModel, Task, Consultant
+from backend.services import outbox, lookup_cache
 from backend.database import SessionLocal
 from backend import models
-from backend.routers.classification import (
-    classify_intent, extract_percent_complete, extract_eta,
-    extract_blockers, summarize_reply
-)
-import openai  
-import os
+from backend.services.extraction import extract_reply
+from backend.services import llm_service
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import openai
 import re
  
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -41,8 +39,8 @@ def get_db():
         db.close()
  
 def get_task_and_consultant(db, task_id, consultant_email):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    consultant = db.query(models.Consultant).filter(models.Consultant.email == consultant_email).first()
+    task = lookup_cache.get_task(db, task_id)
+    consultant = lookup_cache.get_consultant_by_email(db, consultant_email)
     return task, consultant
  
 def strip_subject_line(text: str) -> str:
@@ -53,16 +51,13 @@ def strip_subject_line(text: str) -> str:
     return re.sub(r"^Subject:.*\n+", "", text, flags=re.IGNORECASE)
  
 @router.post("/draft-reply", response_model=DraftReplyResponse)
-def draft_reply(payload: DraftReplyRequest, db=Depends(get_db)):
+async def draft_reply(payload: DraftReplyRequest, db=Depends(get_db)):
     # Analyze the incoming email
-    intent = classify_intent(payload.email_body)
-    percent_complete = extract_percent_complete(payload.email_body)
-    eta_date = extract_eta(payload.email_body)
-    blockers = extract_blockers(payload.email_body)
-    summary = summarize_reply(payload.email_body)
+    fields = extract_reply(payload.email_body)
+    summary = fields["summary"]
  
     # Fetch task and consultant info for context
-    task, consultant = get_task_and_consultant(db, payload.task_id, payload.consultant_email)
+    task, consultant = await run_in_threadpool(get_task_and_consultant, db, payload.task_id, payload.consultant_email)
     if not task or not consultant:
         raise HTTPException(status_code=404, detail="Task or consultant not found")
  
@@ -81,25 +76,21 @@ def draft_reply(payload: DraftReplyRequest, db=Depends(get_db)):
  
     )
  
-    # Create Azure OpenAI client (new SDK style)
-    client = openai.AzureOpenAI(
-        api_key=os.getenv("AZURE_OPENAI_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_VERSION"),
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    )
- 
-    response = client.chat.completions.create(
-        model=os.getenv("AZURE_OPENAI_DEPLOYMENT"),  # Your deployment name
-        messages=[
-            {"role": "system", "content": "You are a helpful project manager assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=300,
-        temperature=0.7,
-    )
+    # Shared, cached and concurrency-limited LLM client
+    try:
+        reply_text = await llm_service.complete_chat(
+            [
+                {"role": "system", "content": "You are a helpful project manager assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=0.7,
+        )
+    except (asyncio.TimeoutError, openai.APITimeoutError):
+        raise HTTPException(status_code=504, detail="Timed out drafting reply")
  
     # Remove any leading 'Subject: ...' line from the reply body
-    reply_body = response.choices[0].message.content.strip()
+    reply_body = reply_text.strip()
     reply_body = strip_subject_line(reply_body)
  
     reply_subject = f"Re: {payload.email_subject}"
@@ -111,11 +102,18 @@ def draft_reply(payload: DraftReplyRequest, db=Depends(get_db)):
     )
  
  
+def latest_leave_update(db, task_id, consultant_id):
+    return db.query(models.StatusUpdate).filter(
+        models.StatusUpdate.task_id == task_id,
+        models.StatusUpdate.consultant_id == consultant_id,
+        models.StatusUpdate.intent == "leave"
+    ).order_by(models.StatusUpdate.created_at.desc()).first()
+ 
+ 
 @router.post("/send-mail")
 def send_mail(payload: SendReplyMailRequest, db=Depends(get_db)):
     # Fetch consultant and task for context
-    task = db.query(Task).filter(Task.id == payload.task_id).first()
-    consultant = db.query(Consultant).filter(Consultant.email == payload.consultant_email).first()
+    task, consultant = get_task_and_consultant(db, payload.task_id, payload.consultant_email)
     if not task or not consultant:
         raise HTTPException(status_code=404, detail="Task or consultant not found")
  
@@ -124,34 +122,19 @@ def send_mail(payload: SendReplyMailRequest, db=Depends(get_db)):
     body = payload.reply_body
     to_emails = [consultant.email]
  
-    try:
-        send_email(subject, body, to_emails)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to send email")
- 
-    # Log the outbound email
-    em = EmailModel(
-        external_message_id=None,
-        direction='outbound',
-        subject=subject,
-        body_text=body,
-        sender=None,
-        recipients=consultant.email,
-        linked_task_id=task.id,
-        linked_consultant_id=consultant.id
+    # Log the outbound email and queue it for delivery
+    item = outbox.enqueue_email(
+        db, subject, body, to_emails,
+        task_id=task.id,
+        consultant_id=consultant.id
     )
-    db.add(em)
-    db.commit()
 
-    status_update = db.query(models.StatusUpdate).filter(
-        models.StatusUpdate.task_id == task.id,
-        models.StatusUpdate.consultant_id == consultant.id,
-        models.StatusUpdate.intent == "leave"
-    ).order_by(models.StatusUpdate.created_at.desc()).first()
+    status_update = latest_leave_update(db, task.id, consultant.id)
     if status_update:
         status_update.reply_sent = 1
-        db.commit()
+    db.commit()
+    outbox.kick()
  
-    return {"status": "ok", "sent_to": to_emails}
+    return {"status": "queued", "sent_to": to_emails, "outbox_id": item.id}
  
  
\ No newline at end of file
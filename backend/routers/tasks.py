@@ -1,10 +1,18 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from typing import Optional
+from datetime import datetime
 from backend import schemas
 from backend.database import SessionLocal
 from backend import models
 from backend.utils.templates import task_assignment_template
-from backend.services.email_service import send_email
+from backend.services import outbox, lookup_cache, task_import, change_feed
+from backend.services.mail_threads import subject_tag
 import logging
  
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -21,7 +29,6 @@ def get_db():
     finally:
         db.close()
  
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
  
  
@@ -39,7 +46,7 @@ def create_task(payload: schemas.TaskCreate, db=Depends(get_db)):
  
     consultants = []
     for assignee in payload.assignees:
-        consultant = db.query(models.Consultant).filter_by(email=assignee.email).first()
+        consultant = db.query(models.Consultant).filter(models.Consultant.email == assignee.email).first()
         if not consultant:
             consultant = models.Consultant(name=assignee.name, email=assignee.email)
             db.add(consultant)
@@ -64,10 +71,78 @@ def create_task(payload: schemas.TaskCreate, db=Depends(get_db)):
     return response
 
 
+@router.post("/import")
+async def import_tasks(request: Request, db=Depends(get_db)):
+    """Bulk-create tasks from a JSON list of TaskCreate objects (or {"tasks": [...]})
+    or a CSV body sent as text/csv. Invalid rows are reported per row and skipped.
+    """
+    raw = await request.body()
+    if "csv" in request.headers.get("content-type", ""):
+        rows = task_import.rows_from_csv(raw.decode("utf-8-sig", errors="replace"))
+    else:
+        try:
+            rows = json.loads(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON list of tasks or text/csv")
+        if isinstance(rows, dict):
+            rows = rows.get("tasks")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON list of tasks or text/csv")
+    if len(rows) > task_import.TASK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {task_import.TASK_IMPORT_MAX_ROWS} rows per import")
+
+    try:
+        report = await run_in_threadpool(task_import.import_tasks, db, rows)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Task import failed: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    logger.info("Tasks imported", extra={"imported": report["imported"], "failed": report["failed"]})
+    return report
+
  
 @router.get("/", response_model=list[schemas.TaskOut])
-def list_tasks(db=Depends(get_db)):
-    tasks = db.query(models.Task).all()
+def list_tasks(
+    response: Response,
+    db=Depends(get_db),
+    status: Optional[models.StatusEnum] = Query(None, description="Only tasks in this status"),
+    assignee_email: Optional[str] = Query(None, description="Only tasks assigned to this consultant"),
+    due_from: Optional[datetime] = Query(None, description="Only tasks ending on or after this date"),
+    due_to: Optional[datetime] = Query(None, description="Only tasks ending on or before this date"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    since: Optional[int] = Query(None, ge=0, description="Change cursor from X-Change-Cursor: only tasks created or modified after it (other filters ignored)")
+):
+    if since is not None and not change_feed.CURSOR_SUPPORTED:
+        raise HTTPException(status_code=501, detail=change_feed.CURSOR_UNSUPPORTED_DETAIL)
+    query = db.query(models.Task)
+    if since is not None:
+        # A delta ignores the filters, so the client also hears about tasks
+        # that stopped matching them
+        ids, cursor = change_feed.changed_ids(db, "task", since, limit)
+        change_feed.set_change_cursor(response, cursor)
+        query, offset = query.filter(models.Task.id.in_(ids)), 0
+    else:
+        # read before the rows, so a delta from it can't miss a write made meanwhile
+        change_feed.set_change_cursor(response, change_feed.current_cursor(db))
+        if status is not None:
+            query = query.filter(models.Task.status == status)
+        if assignee_email:
+            # IN over the assignee's assignments; .any() would be a correlated EXISTS per task
+            query = query.filter(models.Task.id.in_(
+                select(models.assignment_table.c.task_id)
+                .join(models.Consultant, models.Consultant.id == models.assignment_table.c.consultant_id)
+                .where(models.Consultant.email == assignee_email)
+            ))
+        if due_from is not None:
+            query = query.filter(models.Task.end_date >= due_from)
+        if due_to is not None:
+            query = query.filter(models.Task.end_date <= due_to)
+
+    response.headers["X-Total-Count"] = str(query.count())
+    tasks = query.options(
+        selectinload(models.Task.consultants)
+    ).order_by(models.Task.id).offset(offset).limit(limit).all()
     return [
         {
             "id": t.id,
@@ -88,7 +163,7 @@ def send_update_request(payload: SendTaskEmailRequest, db=Depends(get_db)):
     logger.info(f"Received request to send update for task_id={payload.task_id}")
  
     # Fetch the task and assignees
-    task = db.query(models.Task).filter(models.Task.id == payload.task_id).first()
+    task = lookup_cache.get_task(db, payload.task_id)
     if not task:
         logger.error(f"Task with id {payload.task_id} not found")
         raise HTTPException(status_code=404, detail="Task not found")
@@ -100,7 +175,7 @@ def send_update_request(payload: SendTaskEmailRequest, db=Depends(get_db)):
     # Compose subject and body
     names = [a.name for a in assignees]
     greeting = f"Hello {'/'.join(names)}," if names else "Hello,"
-    subject = f"Task Assignment: {task.name}"
+    subject = f"{subject_tag(task.name)} Task Assignment"
     body = (
         f"{greeting}\n\n"
         f"You have been assigned a new task.\n\n"
@@ -117,32 +192,14 @@ def send_update_request(payload: SendTaskEmailRequest, db=Depends(get_db)):
  
     # Collect emails
     to_emails = [a.email for a in assignees]
-    logger.info(f"Sending task assignment email to: {to_emails}")
+    logger.info(f"Queueing task assignment email to: {to_emails}")
  
-    try:
-        # Send the email using Azure Communication Services Email SDK
-        from backend.services.email_service import send_email
-        send_email(subject, body, to_emails, html_body=html_body)
-        logger.info(f"Email sent successfully for task_id={payload.task_id}")
-    except Exception as e:
-        logger.error(f"Failed to send email for task_id={payload.task_id}: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Failed to send email")
- 
-    # Save outbound email record
-    from backend.models import EmailMessage as EmailModel
-    em = EmailModel(
-        external_message_id=None,
-        direction='outbound',
-        subject=subject,
-        body_text=body,
-        sender=None,
-        recipients=','.join(to_emails),
-        linked_task_id=task.id
-    )
-    db.add(em)
+    # Record the outbound email and queue it for delivery in one transaction
+    item = outbox.enqueue_email(db, subject, body, to_emails, html_body=html_body, task_id=task.id)
     db.commit()
-    logger.info(f"Email record saved for task_id={payload.task_id}")
+    outbox.kick()
+    logger.info(f"Email queued as outbox_id={item.id} for task_id={payload.task_id}")
  
-    return {"status": "ok", "sent_to": to_emails}
+    return {"status": "queued", "sent_to": to_emails, "outbox_id": item.id}
  
  
\ No newline at end of file
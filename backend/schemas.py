@@ -103,4 +103,20 @@ class TaskReminderResponse(BaseModel):
     message: str
  
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class OutboxStatusOut(BaseModel):
+    id: int
+    email_message_id: Optional[int] = None
+    recipients: str
+    subject: Optional[str] = None
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    provider_message_id: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,279 @@
+"""Change feed: a monotonic cursor over Task and StatusUpdate writes.
+
+Every flush that inserts, updates or deletes a Task or StatusUpdate appends one
+``changes`` row per object in the same transaction, so a change becomes
+visible exactly when the write commits. ``changes.id`` is the cursor:
+list endpoints return the current one in X-Change-Cursor, ``?since=<cursor>``
+returns only the rows changed after it, and /changes/stream pushes each change
+as a Server-Sent Event.
+
+The cursor is only served on SQLite, where one writer commits at a time and
+ids therefore become visible in order. On a server database a transaction can
+commit a lower id after a higher one is already visible, and a client reading
+in between would step over it for good. There, CURSOR_SUPPORTED is False: no
+X-Change-Cursor is returned, ``since=`` and /changes/ answer 501, and clients
+re-fetch full lists. Changes are still recorded. Core statements
+(``insert()`` executemany, ``query.update()``) bypass the session events, so
+callers record() those rows themselves. Rows older than
+CHANGE_FEED_RETENTION_DAYS are pruned daily. A client whose cursor is older
+than that should reload its lists in full.
+"""
+import asyncio
+import logging
+import os
+import weakref
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import AsyncSessionLocal, SessionLocal, engine
+
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 2))
+CHANGE_FEED_BUFFER = int(os.getenv("CHANGE_FEED_BUFFER", 1000))
+CHANGE_FEED_RETENTION_DAYS = int(os.getenv("CHANGE_FEED_RETENTION_DAYS", 30))
+CHANGE_FEED_BATCH = 500
+
+CURSOR_SUPPORTED = engine.dialect.name == "sqlite"
+CURSOR_UNSUPPORTED_DETAIL = "Change cursors are only available on SQLite; fetch the full list instead"
+
+logger = logging.getLogger(__name__)
+
+ENTITIES = {models.Task: "task", models.StatusUpdate: "status_update"}
+
+
+# --- recording ----------------------------------------------------------------
+
+def record(db, entity, ids, op):
+    """Record a Core write to ``entity`` rows that the session events can't see."""
+    rows = [{"entity": entity, "entity_id": id_, "op": op} for id_ in ids]
+    if rows:
+        db.execute(insert(models.Change), rows)
+        db.info["change_feed_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    rows = []
+    for objects, op in ((session.new, "insert"), (session.dirty, "update"), (session.deleted, "delete")):
+        for obj in objects:
+            entity = ENTITIES.get(type(obj))
+            if entity is None or (op == "update" and not session.is_modified(obj)):
+                continue
+            rows.append({"entity": entity, "entity_id": obj.id, "op": op})
+    if rows:
+        # on the flush's own connection: session.execute() here would re-enter flush
+        session.connection().execute(insert(models.Change.__table__), rows)
+        session.info["change_feed_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_on_commit(session):
+    if session.info.pop("change_feed_dirty", False):
+        for feed in list(_feeds):
+            feed.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("change_feed_dirty", None)
+
+
+def prune_changes(retention_days=CHANGE_FEED_RETENTION_DAYS):
+    """Delete change rows older than ``retention_days``; returns how many."""
+    session = SessionLocal()
+    try:
+        n = session.query(models.Change).filter(
+            models.Change.changed_at < datetime.utcnow() - timedelta(days=retention_days)
+        ).delete(synchronize_session=False)
+        session.commit()
+        logger.info("Change feed pruned", extra={"deleted": n, "retention_days": retention_days})
+        return n
+    finally:
+        session.close()
+
+
+# --- reading ------------------------------------------------------------------
+
+_head_statement = select(func.coalesce(func.max(models.Change.id), 0))
+
+
+def _changes_statement(entity, since, head, limit):
+    stmt = select(models.Change.id, models.Change.entity_id).where(
+        models.Change.id > since, models.Change.id <= head
+    )
+    if entity is not None:
+        stmt = stmt.where(models.Change.entity == entity)
+    return stmt.order_by(models.Change.id).limit(limit)
+
+
+def _finish_changed_ids(changes, head, limit):
+    # A full page may have more behind it: resume from its last change
+    cursor = changes[-1].id if len(changes) == limit else head
+    return list(dict.fromkeys(c.entity_id for c in changes)), cursor
+
+
+def current_cursor(db):
+    """The newest change id, or None where cursors aren't supported."""
+    return db.execute(_head_statement).scalar() if CURSOR_SUPPORTED else None
+
+
+async def current_cursor_async(db):
+    return (await db.execute(_head_statement)).scalar() if CURSOR_SUPPORTED else None
+
+
+def set_change_cursor(response, cursor):
+    if cursor is not None:
+        response.headers["X-Change-Cursor"] = str(cursor)
+
+
+def changed_ids(db, entity, since, limit):
+    """Ids of ``entity`` rows changed after cursor ``since``, at most ``limit`` changes' worth.
+
+    Returns (ids, cursor); pass ``cursor`` back as ``since`` for the next delta.
+    The cursor is read before the changes, so rows fetched afterwards may be
+    newer than it and come round again next time, but none is skipped.
+    """
+    head = current_cursor(db)
+    return _finish_changed_ids(db.execute(_changes_statement(entity, since, head, limit)).all(), head, limit)
+
+
+async def changed_ids_async(db, entity, since, limit):
+    """changed_ids on an AsyncSession."""
+    head = await current_cursor_async(db)
+    changes = (await db.execute(_changes_statement(entity, since, head, limit))).all()
+    return _finish_changed_ids(changes, head, limit)
+
+
+async def changes_after(db, since, limit=CHANGE_FEED_BATCH):
+    """Change rows after cursor ``since``, oldest first."""
+    return (await db.execute(
+        select(models.Change).where(models.Change.id > since).order_by(models.Change.id).limit(limit)
+    )).scalars().all()
+
+
+# --- push -----------------------------------------------------------------------
+
+_feeds = weakref.WeakSet()
+
+
+class ChangeFeed:
+    """Per-process fan-out of committed changes to any number of subscribers.
+
+    While anyone is subscribed, one task reads ``changes`` past the last row it
+    saw. It runs every CHANGE_FEED_POLL_SECONDS, and at once when a session in
+    this process commits a change. ``load_events(db, changes)`` turns each
+    batch into ``(cursor, event, data)`` tuples. The newest CHANGE_FEED_BUFFER
+    events are kept in memory, so a change costs one round of queries however
+    many clients are listening. Writes by other processes, such as the IMAP
+    poller in the scheduler worker, arrive with the next poll. A subscriber
+    whose cursor is older than the buffer, or that fell behind it, catches up
+    from the database.
+    """
+
+    def __init__(self, load_events, buffer=CHANGE_FEED_BUFFER, poll_seconds=CHANGE_FEED_POLL_SECONDS):
+        self._load_events = load_events
+        self._events = deque(maxlen=buffer)
+        self.poll_seconds = poll_seconds
+        self._head = None  # last change read
+        self._floor = None  # the buffer holds every event after this cursor
+        self._loop = None
+        self._wakeup = None
+        self._updated = None
+        self._pump = None
+        self._subscribers = 0
+        _feeds.add(self)
+
+    def notify(self):
+        """Poll now rather than at the next interval; safe from any thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._pump is not None and not self._pump.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._updated = asyncio.Condition()
+        self._events.clear()
+        self._head = self._floor = None
+        self._pump = loop.create_task(self._run())
+
+    async def _poll(self):
+        async with AsyncSessionLocal() as db:
+            if self._head is None:
+                self._head = self._floor = await current_cursor_async(db)
+                return False
+            changes = await changes_after(db, self._head)
+            if not changes:
+                return False
+            events = await self._load_events(db, changes)
+        for item in events:
+            if len(self._events) == self._events.maxlen:
+                self._floor = self._events[0][0]  # about to be dropped
+            self._events.append(item)
+        self._head = changes[-1].id
+        return len(changes) == CHANGE_FEED_BATCH
+
+    async def _run(self):
+        while self._subscribers:
+            more = False
+            try:
+                more = await self._poll()
+                async with self._updated:
+                    self._updated.notify_all()
+            except Exception as e:
+                logger.exception(f"Change feed poll failed: {e}")
+            if more:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def subscribe(self, since=None, heartbeat=None):
+        """Yield ``(cursor, event, data)`` for each change after ``since``, forever.
+
+        ``since`` None starts from the present. With ``heartbeat`` seconds,
+        None is yielded whenever that long passes without a change, so the
+        caller can keep an idle connection open.
+        """
+        self._subscribers += 1
+        self._ensure_started()
+        updated = self._updated
+        try:
+            async with updated:
+                await updated.wait_for(lambda: self._head is not None)
+            cursor = self._head if since is None else since
+            while True:
+                if cursor < self._floor:
+                    async with AsyncSessionLocal() as db:
+                        changes = await changes_after(db, cursor)
+                        events = await self._load_events(db, changes) if changes else []
+                    for item in events:
+                        yield item
+                    cursor = changes[-1].id if changes else self._floor
+                    continue
+
+                pending = [item for item in self._events if item[0] > cursor]
+                if pending:
+                    for item in pending:
+                        yield item
+                    cursor = pending[-1][0]
+                    continue
+                cursor = max(cursor, self._head)  # changes that produced no event
+
+                async with updated:
+                    try:
+                        await asyncio.wait_for(updated.wait_for(lambda: self._head > cursor), heartbeat)
+                    except asyncio.TimeoutError:
+                        pass
+                if self._head <= cursor:
+                    yield None
+        finally:
+            self._subscribers -= 1
@@ -0,0 +1,64 @@
+import os
+import time
+import threading
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from backend import models
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", 60))
+
+# Writes to these models can move a task between dashboard buckets.
+_WATCHED = (models.Task, models.StatusUpdate, models.Consultant)
+
+_lock = threading.Lock()
+_value = None
+_expires_at = 0.0
+_version = 0
+
+
+def invalidate():
+    global _value, _version
+    with _lock:
+        _value = None
+        _version += 1
+
+
+def get_or_compute(compute):
+    """Return the cached dashboard summary, recomputing it with ``compute()`` on a miss.
+
+    The entry is dropped whenever a session commits a change to a Task,
+    StatusUpdate or Consultant, and also expires after DASHBOARD_CACHE_TTL
+    seconds because the buckets are relative to the current time. The cache is
+    per process; other workers converge within the TTL.
+    """
+    global _value, _expires_at
+    now = time.monotonic()
+    with _lock:
+        if _value is not None and now < _expires_at:
+            return _value
+        version = _version
+    value = compute()
+    with _lock:
+        # Don't store a result that raced with a write committed meanwhile.
+        if version == _version:
+            _value = value
+            _expires_at = now + DASHBOARD_CACHE_TTL
+    return value
+
+
+@event.listens_for(Session, "after_flush")
+def _track_dashboard_writes(session, flush_context):
+    if any(isinstance(obj, _WATCHED) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["dashboard_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("dashboard_dirty", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("dashboard_dirty", None)
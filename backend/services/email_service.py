@@ -1,38 +1,123 @@
- 
+
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.communication.email import EmailClient
 from dotenv import load_dotenv
- 
+from backend.services.metrics import track_call, external_call_duration, external_call_errors
+
 load_dotenv()
- 
+
 email_connection_string = os.getenv("ACS_EMAIL_CONNECTION_STRING")
 sender_address = os.getenv("ACS_SENDER_ADDRESS")
- 
+# Max keep-alive connections to ACS, and max concurrent submissions in send_emails
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 10))
+# Seconds between LRO status polls when ACS does not send Retry-After
+EMAIL_POLLING_INTERVAL = float(os.getenv("EMAIL_POLLING_INTERVAL", 30))
+
 logger = logging.getLogger(__name__)
- 
+
+_client = None
+_client_lock = threading.Lock()
+_submit_pool = ThreadPoolExecutor(max_workers=EMAIL_POOL_SIZE, thread_name_prefix="acs-send")
+
+def _parse_connection_string(conn_str):
+    # Unlike EmailClient.from_connection_string, keep the endpoint's scheme so a
+    # local http:// endpoint (see benchmarks/fake_acs_server.py) is not forced to https.
+    parts = dict(p.split("=", 1) for p in (conn_str or "").split(";") if "=" in p)
+    parts = {k.lower(): v for k, v in parts.items()}
+    if not parts.get("endpoint") or not parts.get("accesskey"):
+        raise ValueError("Invalid ACS_EMAIL_CONNECTION_STRING; expected endpoint=https://<resource>/;accesskey=<key>")
+    return parts["endpoint"].rstrip("/"), parts["accesskey"]
+
+def get_email_client():
+    """Return the process-wide EmailClient, building it on first use.
+
+    The client shares one requests.Session, so TLS connections to ACS are
+    kept alive and reused across sends instead of re-established per email.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=EMAIL_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                transport = RequestsTransport(session=session, session_owner=False)
+                endpoint, access_key = _parse_connection_string(email_connection_string)
+                _client = EmailClient(endpoint, AzureKeyCredential(access_key), transport=transport)
+    return _client
+
+def reset_email_client():
+    """Drop the cached client so the next send picks up a new connection string."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def build_message(subject, body, to_emails, html_body=None, headers=None):
+    message = {
+        "senderAddress": sender_address,
+        "recipients": {
+            "to": [{"address": email} for email in to_emails],
+        },
+        "content": {
+            "subject": subject,
+            "plainText": body,
+        },
+    }
+    if html_body:
+        message["content"]["html"] = html_body
+    if headers:
+        message["headers"] = headers
+    return message
+
 def send_email(subject, body, to_emails, html_body=None):
     try:
-        client = EmailClient.from_connection_string(email_connection_string)
-        message = {
-            "senderAddress": sender_address,
-            "recipients": {
-                "to": [{"address": email} for email in to_emails],
-            },
-            "content": {
-                "subject": subject,
-                "plainText": body,
-            },
-        }
-        if html_body:
-            message["content"]["html"] = html_body
- 
-        poller = client.begin_send(message)
-        result = poller.result()
+        client = get_email_client()
+        with track_call("email", "send"):
+            poller = client.begin_send(
+                build_message(subject, body, to_emails, html_body=html_body),
+                polling_interval=EMAIL_POLLING_INTERVAL
+            )
+            result = poller.result()
         logger.info(f"Email sent. Message ID: {result['id']}")
         return result
     except Exception as e:
         logger.error(f"Error sending email: {e}")
         raise
- 
- 
\ No newline at end of file
+
+def send_emails(messages):
+    """Submit many emails at once and wait for all of their operations together.
+
+    ``messages`` is a list of dicts with ``subject``, ``body``, ``to_emails`` and
+    optional ``html_body`` and ``headers``. Submissions run concurrently on a bounded pool and
+    each poller tracks its operation in the background, so total latency is
+    close to the slowest message rather than the sum. Returns one entry per
+    message, in order: the ACS result dict, or the exception raised for it.
+    """
+    client = get_email_client()
+    results = []
+    with external_call_duration.time("email", "send_batch"):
+        futures = [
+            _submit_pool.submit(client.begin_send, build_message(**m), polling_interval=EMAIL_POLLING_INTERVAL)
+            for m in messages
+        ]
+        for fut in futures:
+            try:
+                results.append(fut.result().result())
+            except Exception as e:
+                logger.error(f"Error sending email: {e}")
+                external_call_errors.inc("email", "send_batch")
+                results.append(e)
+    sent = sum(1 for r in results if not isinstance(r, Exception))
+    logger.info(f"Email batch sent: {sent}/{len(messages)} succeeded")
+    return results
+
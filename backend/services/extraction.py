@@ -0,0 +1,123 @@
+
+import re
+from typing import Dict, Optional
+
+# Free-text reply patterns (used by /tasks/process-reply and /tasks/draft-reply)
+PCT_COMPLETE_RE = re.compile(r"(\d{1,3})\s*%[\s\w]*complete", re.IGNORECASE)
+PCT_ANY_RE = re.compile(r"(\d{1,3})\s*%")
+ETA_DATE_RE = re.compile(r"eta[:\s\-]*([0-9]{4}-[0-9]{2}-[0-9]{2})", re.IGNORECASE)
+BLOCKED_BY_RE = re.compile(r"blocked by ([^\.\n]+)", re.IGNORECASE)
+ABSENCE_RE = re.compile(r"on leave from ([0-9\-]+) to ([0-9\-]+)(?: due to ([\w\s]+))?", re.IGNORECASE)
+
+# Reply-template patterns (the "Status: / Percent complete: / ..." form in task emails)
+FORM_STATUS_RE = re.compile(r"Status:\s*(Not Started|In Progress|Blocked|Done)", re.IGNORECASE)
+FORM_PCT_RE = re.compile(r"Percent(?:\s|\-|_)?complete:\s*(\d{1,3})", re.IGNORECASE)
+FORM_BLOCKERS_RE = re.compile(r"Blockers?:\s*(.+)", re.IGNORECASE)
+FORM_ETA_RE = re.compile(r"ETA:\s*([\w\-\/\,\s]+)", re.IGNORECASE)
+FORM_TASK_RE = re.compile(r"Task:\s*(.+)", re.IGNORECASE)
+
+LEAVE_KEYWORDS = ("ooo", "vacation", "sick", "leave")
+UPDATE_KEYWORDS = ("progress", "complete", "blocked", "eta", "%", "update")
+
+def determine_status_label(intent: str, percent_complete: Optional[int], blockers: Optional[str]) -> str:
+    if percent_complete is not None:
+        if percent_complete == 0:
+            return "Not Started"
+        elif percent_complete == 100:
+            return "Completed"
+        else:
+            return "In Progress"
+    elif blockers:
+        return "Blocked"
+    elif intent == "leave":
+        return "On Leave"
+    elif intent == "update":
+        return "In Progress"
+    else:
+        return "Unknown"
+
+
+def _search(pattern, body, lower, keyword):
+    # ``in`` is a C-speed substring scan; most bodies lack most keywords, so
+    # most patterns never run
+    return pattern.search(body) if keyword in lower else None
+
+
+def extract_reply(body: str) -> Dict:
+    """Extract every reply field from ``body``, running each pattern at most once.
+
+    Returns the free-text fields (intent, percent_complete, eta_date, blockers,
+    absence, summary, status_label) plus ``form``: the reply-template fields
+    (status_label, status_pct, blockers, eta_date, task_name), each taken from
+    its first occurrence in the text. A pattern only runs when the literal
+    text it needs appears in the lower-cased body.
+    """
+    body = body or ""
+    lower = body.lower()
+    leave_kw = any(word in lower for word in LEAVE_KEYWORDS)
+    update_kw = any(word in lower for word in UPDATE_KEYWORDS)
+
+    pct_complete = pct_any = None
+    if "%" in lower:
+        pm = PCT_COMPLETE_RE.search(body) if "complete" in lower else None
+        if pm:
+            pct_complete = int(pm.group(1))
+        else:
+            pm = PCT_ANY_RE.search(body)
+            pct_any = int(pm.group(1)) if pm else None
+
+    em = _search(ETA_DATE_RE, body, lower, "eta")
+    eta = em.group(1) if em else None
+    bm = _search(BLOCKED_BY_RE, body, lower, "blocked by")
+    blockers = bm.group(1).strip() if bm else None
+    absence = None
+    am = _search(ABSENCE_RE, body, lower, "on leave from")
+    if am:
+        start, end, reason = am.groups()
+        absence = f"On leave {start} to {end}" + (f" ({reason.strip()})" if reason else "")
+
+    form = {"status_label": None, "status_pct": None, "blockers": None, "eta_date": None, "task_name": None}
+    fm = _search(FORM_STATUS_RE, body, lower, "status:")
+    if fm:
+        form["status_label"] = fm.group(1).title()
+    fm = _search(FORM_PCT_RE, body, lower, "percent")
+    if fm:
+        form["status_pct"] = max(0, min(100, int(fm.group(1))))
+    fm = _search(FORM_BLOCKERS_RE, body, lower, "blocker")
+    if fm:
+        form["blockers"] = fm.group(1).strip()
+    fm = _search(FORM_ETA_RE, body, lower, "eta:")
+    if fm:
+        form["eta_date"] = fm.group(1).strip()
+    fm = _search(FORM_TASK_RE, body, lower, "task:")
+    if fm:
+        form["task_name"] = fm.group(1).strip()
+
+    percent_complete = pct_complete if pct_complete is not None else pct_any
+    if leave_kw:
+        intent = "leave"
+    elif update_kw:
+        intent = "update"
+    else:
+        intent = "other"
+
+    summary_parts = []
+    if percent_complete is not None:
+        summary_parts.append(f"{percent_complete}% complete")
+    if blockers:
+        summary_parts.append(f"Blocked by {blockers}")
+    if eta:
+        summary_parts.append(f"ETA: {eta}")
+    if absence:
+        summary_parts.append(absence)
+
+    return {
+        "intent": intent,
+        "percent_complete": percent_complete,
+        "eta_date": eta,
+        "blockers": blockers,
+        "absence": absence,
+        "summary": ". ".join(summary_parts) + ("." if summary_parts else ""),
+        "status_label": determine_status_label(intent, percent_complete, blockers),
+        "form": form,
+    }
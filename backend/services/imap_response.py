@@ -0,0 +1,128 @@
+"""Parsing of IMAP FETCH responses and BODYSTRUCTURE (RFC 3501).
+
+imaplib hands back FETCH data as a flat list in which every literal
+(``{n}`` followed by n bytes) splits the line into an (envelope, literal)
+tuple, and the rest arrives as plain bytes. parse_fetch() turns that into one
+dict per message, e.g. ``{"UID": b"42", "BODYSTRUCTURE": [...],
+"BODY[1]<0>": b"..."}``; nested lists are Python lists, strings and literals
+are bytes, and NIL is None.
+"""
+import re
+from collections import namedtuple
+
+_OPEN = object()
+_CLOSE = object()
+
+# (, ), "quoted", a {n} literal marker at the end of a line, or an atom, which
+# may carry a section spec with spaces and parens: BODY[HEADER.FIELDS (FROM)]<0>
+_TOKEN_RE = re.compile(
+    rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}\s*$|([^\s()"\[]+(?:\[[^\]]*\](?:<[\d.]+>)?)?))'
+)
+_QUOTED_ESCAPE_RE = re.compile(rb'\\(.)')
+
+TextPart = namedtuple('TextPart', 'section subtype charset encoding size')
+
+
+def _tokenize(data):
+    for item in data:
+        text, literal = item if isinstance(item, tuple) else (item, None)
+        pos = 0
+        while pos < len(text):
+            m = _TOKEN_RE.match(text, pos)
+            if not m or m.end() == pos:
+                if text[pos:].strip():
+                    raise ValueError(f"Unparseable IMAP response near {text[pos:pos + 40]!r}")
+                break
+            pos = m.end()
+            if m.group(1):
+                yield _OPEN
+            elif m.group(2):
+                yield _CLOSE
+            elif m.group(3) is not None:
+                yield _QUOTED_ESCAPE_RE.sub(rb'\1', m.group(3))
+            elif m.group(4) is not None:
+                yield literal
+            elif m.group(5):
+                atom = m.group(5)
+                yield None if atom.upper() == b'NIL' else atom
+
+
+def _nest(tokens):
+    stack = [[]]
+    for token in tokens:
+        if token is _OPEN:
+            stack.append([])
+        elif token is _CLOSE:
+            inner = stack.pop()
+            stack[-1].append(inner)
+        else:
+            stack[-1].append(token)
+    return stack[0]
+
+
+def parse_fetch(data):
+    """One dict per message in a FETCH response, keyed by upper-cased item name."""
+    messages = []
+    top = _nest(_tokenize(data))
+    # top level alternates: message sequence number, (item value item value ...)
+    for items in top:
+        if isinstance(items, list):
+            messages.append({
+                key.decode('ascii', 'replace').upper(): value
+                for key, value in zip(items[::2], items[1::2])
+            })
+    return messages
+
+
+def fetch_item(message, prefix):
+    """Value of the first item whose name starts with ``prefix`` (servers vary the echo)."""
+    for key, value in message.items():
+        if key.startswith(prefix):
+            return value
+    return None
+
+
+def _text(value):
+    return value.decode('ascii', 'replace').lower() if isinstance(value, bytes) else None
+
+
+def _params(value):
+    if not isinstance(value, list):
+        return {}
+    return {_text(k): v.decode('utf-8', 'replace') for k, v in zip(value[::2], value[1::2]) if v is not None}
+
+
+def find_text_part(structure, prefix=''):
+    """The first inline text/plain part in a BODYSTRUCTURE, or None.
+
+    A single-part message is returned whatever its text subtype, matching how
+    bodies were read before. Attached message/rfc822 parts are not searched.
+    """
+    if not isinstance(structure, list) or not structure:
+        return None
+    if isinstance(structure[0], list):
+        # multipart: (part)(part)... subtype [extensions, which may be lists too]
+        for i, part in enumerate(structure):
+            if not isinstance(part, list):
+                break
+            found = find_text_part(part, f'{prefix}{i + 1}.')
+            if found:
+                return found
+        return None
+
+    media_type, subtype = _text(structure[0]), _text(structure[1])
+    if media_type != 'text':
+        return None
+    if prefix and subtype != 'plain':
+        return None
+    # text parts: type subtype params id description encoding size lines md5 disposition ...
+    disposition = structure[9] if len(structure) > 9 else None
+    if prefix and isinstance(disposition, list) and _text(disposition[0]) == 'attachment':
+        return None
+    return TextPart(
+        section=prefix.rstrip('.') or '1',
+        subtype=subtype,
+        charset=_params(structure[2]).get('charset'),
+        encoding=_text(structure[5]) or '7bit',
+        size=int(structure[6]) if structure[6] else 0,
+    )
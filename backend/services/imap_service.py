@@ -1,17 +1,42 @@
+import base64
+import logging
 import os
+import quopri
+import re
 import imaplib
-import email
 from email.header import decode_header
+from email.parser import BytesHeaderParser
 from dotenv import load_dotenv
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
 from backend.database import SessionLocal
 from backend import models
 from backend.services.parser import parse_status_from_text
+from backend.services.metrics import track_call
+from backend.services.imap_response import fetch_item, find_text_part, parse_fetch
+from backend.services.mail_threads import resolve_threads
+from backend.services.lookup_cache import get_consultant_ids
 
 load_dotenv()
 IMAP_HOST = os.getenv('IMAP_HOST')
 IMAP_PORT = int(os.getenv('IMAP_PORT', 993))
 IMAP_USER = os.getenv('IMAP_USER')
 IMAP_PASS = os.getenv('IMAP_PASS')
+IMAP_BATCH_SIZE = int(os.getenv('IMAP_BATCH_SIZE', 50))
+IMAP_MAILBOX = os.getenv('IMAP_MAILBOX', 'INBOX')
+# First sync of a mailbox: "true" ingests its existing mail, otherwise only mail arriving from now on
+IMAP_BACKFILL = os.getenv('IMAP_BACKFILL', 'false').lower() == 'true'
+# Bytes of a message's text part to download; longer bodies are truncated
+IMAP_MAX_BODY_BYTES = int(os.getenv('IMAP_MAX_BODY_BYTES', 64 * 1024))
+
+logger = logging.getLogger(__name__)
+
+# The database itself failed (locked, unreachable, pool exhausted), not one
+# message: nothing is skipped and the next poll retries from the watermark
+DB_UNAVAILABLE_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+HEADER_FIELDS = "MESSAGE-ID IN-REPLY-TO REFERENCES FROM TO SUBJECT"
+HEADER_PARSER = BytesHeaderParser()
+SENDER_RE = re.compile(r"<([^>]+)>")
 
 
 def _decode_header_part(h):
@@ -25,87 +50,276 @@ def _decode_header_part(h):
     return ''.join(out)
 
 
-def poll_inbound_and_process(limit=10):
-    """Simple IMAP poller that looks for UNSEEN messages and tries to parse them.
-    This is a minimal implementation; for production use webhooks or robust mail parsing.
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _parse_headers(raw_headers):
+    msg = HEADER_PARSER.parsebytes(raw_headers or b'')
+    from_ = _decode_header_part(msg.get('From') or '')
+    m = SENDER_RE.search(from_)
+    return {
+        'message_id': msg.get('Message-ID'),
+        'in_reply_to': msg.get('In-Reply-To'),
+        'references': msg.get('References'),
+        'subject': _decode_header_part(msg.get('Subject') or ''),
+        'from': from_,
+        'to': _decode_header_part(msg.get('To') or ''),
+        'sender_email': m.group(1) if m else from_,
+        'body': None,
+    }
+
+
+def _decode_body(raw, part):
+    """Decode a (possibly truncated) section using the part's transfer encoding and charset."""
+    if part.encoding == 'base64':
+        raw = re.sub(rb'\s+', b'', raw)
+        raw = raw[:len(raw) // 4 * 4]  # drop a partial quantum left by the byte cap
+        data = base64.b64decode(raw)
+    elif part.encoding == 'quoted-printable':
+        data = quopri.decodestring(raw)
+    else:
+        data = raw
+    try:
+        return data.decode(part.charset or 'utf-8', errors='ignore')
+    except LookupError:  # unknown charset name
+        return data.decode('utf-8', errors='ignore')
+
+
+def fetch_batch(mail, uids):
+    """Fetch headers and the plain-text body for a set of UIDs; returns (uid, message) pairs.
+
+    The first round trip reads BODYSTRUCTURE and a few headers, the second
+    fetches only each message's text/plain section, capped at
+    IMAP_MAX_BODY_BYTES, so attachments are never downloaded. UIDs whose text
+    part has the same section number share one FETCH. BODY.PEEK never sets
+    \\Seen. Raises imaplib.IMAP4.error if any FETCH fails, so the batch is
+    retried as a whole rather than stored incomplete.
+    """
+    with track_call('imap', 'fetch'):
+        status, data = mail.uid('fetch', b','.join(uids), f'(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])')
+    if status != 'OK':
+        # raise rather than return nothing, or the caller would advance the watermark past these UIDs
+        raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+    messages = {}
+    text_parts = {}
+    by_section = {}
+    for response in parse_fetch(data):
+        uid = int(response['UID'])
+        messages[uid] = _parse_headers(fetch_item(response, 'BODY[HEADER'))
+        part = find_text_part(response.get('BODYSTRUCTURE'))
+        if part:
+            text_parts[uid] = part
+            by_section.setdefault(part.section, []).append(str(uid).encode())
+
+    for section, section_uids in by_section.items():
+        with track_call('imap', 'fetch_text'):
+            status, data = mail.uid('fetch', b','.join(section_uids), f'(UID BODY.PEEK[{section}]<0.{IMAP_MAX_BODY_BYTES}>)')
+        if status != 'OK':
+            # Stored without a body these replies would never yield a status
+            # update, and the Message-ID check would stop a re-fetch: fail the batch
+            raise imaplib.IMAP4.error(f"UID FETCH of body section {section} failed: {data}")
+        for response in parse_fetch(data):
+            uid = int(response['UID'])
+            raw = fetch_item(response, f'BODY[{section}]')
+            if uid in messages and raw is not None:
+                messages[uid]['body'] = _decode_body(raw, text_parts[uid])
+    return sorted(messages.items())
+
+
+def ingest_batch(session, messages):
+    """Stage one batch of fetched messages in ``session``; the caller commits.
+
+    Deduplicates on Message-ID with one IN query against EmailMessage, resolves
+    senders through the lookup cache (one IN query for the misses) and the task each reply
+    belongs to via resolve_threads, then bulk-inserts the EmailMessage and
+    StatusUpdate rows. Returns the number of new messages stored.
+    """
+    message_ids = {p['message_id'] for p in messages if p['message_id']}
+    seen = set()
+    if message_ids:
+        seen = {
+            row[0] for row in session.query(models.EmailMessage.external_message_id)
+            .filter(models.EmailMessage.external_message_id.in_(message_ids))
+        }
+
+    fresh = []
+    for p in messages:
+        mid = p['message_id']
+        if mid and mid in seen:
+            continue
+        if mid:
+            seen.add(mid)
+        fresh.append(p)
+    if not fresh:
+        return 0
+
+    consultant_ids = get_consultant_ids(session, (p['sender_email'] for p in fresh))
+    threads = resolve_threads(session, fresh)
+
+    email_records = [
+        models.EmailMessage(
+            external_message_id=p['message_id'],
+            direction='inbound',
+            subject=p['subject'],
+            body_text=p['body'],
+            sender=p['from'],
+            recipients=p['to'],
+            thread_id=thread_id,
+            linked_task_id=task_id,
+            linked_consultant_id=consultant_ids.get(p['sender_email'])
+        )
+        for p, (task_id, thread_id) in zip(fresh, threads)
+    ]
+    session.add_all(email_records)
+    session.flush()  # assign email_records[i].id
+
+    status_updates = []
+    for p, email_record in zip(fresh, email_records):
+        parsed_status = parse_status_from_text(p['body'] or '')
+        # Create StatusUpdate only if we detect useful info
+        if parsed_status.get('status_label') or parsed_status.get('status_pct'):
+            status_updates.append(models.StatusUpdate(
+                task_id=email_record.linked_task_id,
+                consultant_id=email_record.linked_consultant_id,
+                status_pct=parsed_status.get('status_pct'),
+                status_label=parsed_status.get('status_label'),
+                summary=parsed_status.get('summary'),
+                blockers=parsed_status.get('blockers'),
+                eta_date=parsed_status.get('eta_date'),
+                source_email_id=email_record.id
+            ))
+    session.add_all(status_updates)
+    return len(fresh)
+
+
+def select_mailbox(mail, mailbox=IMAP_MAILBOX):
+    """Open ``mailbox`` read-only (EXAMINE) and return its (UIDVALIDITY, UIDNEXT)."""
+    status, data = mail.select(mailbox, readonly=True)
+    if status != 'OK':
+        raise imaplib.IMAP4.error(f"Cannot select {mailbox}: {data}")
+    _, data = mail.response('UIDVALIDITY')
+    uid_validity = int(data[0])
+    _, data = mail.response('UIDNEXT')
+    if not data or data[0] is None:
+        # Not every server sends UIDNEXT with SELECT; STATUS always has it
+        status, data = mail.status(mailbox, '(UIDNEXT)')
+        m = re.search(rb'UIDNEXT (\d+)', data[0] or b'') if status == 'OK' else None
+        if not m:
+            raise imaplib.IMAP4.error(f"Cannot read UIDNEXT of {mailbox}: {data}")
+        data = [m.group(1)]
+    return uid_validity, int(data[0])
+
+
+def load_sync_state(session, mailbox, uid_validity, uid_next, backfill=IMAP_BACKFILL):
+    """The stored watermark for ``mailbox``, reset if the server renumbered its UIDs.
+
+    A mailbox seen for the first time starts at UIDNEXT - 1, so existing mail
+    is not ingested as new status updates, unless ``backfill`` is set.
+    """
+    state = session.get(models.ImapSyncState, mailbox)
+    if state is None:
+        state = models.ImapSyncState(mailbox=mailbox, uid_validity=uid_validity,
+                                     last_uid=0 if backfill else uid_next - 1)
+        session.add(state)
+    elif state.uid_validity != uid_validity:
+        # Old UIDs mean nothing now; resync from the start and let the
+        # Message-ID check skip what was already stored
+        logger.warning("IMAP UIDVALIDITY changed; resyncing mailbox",
+                       extra={"mailbox": mailbox, "old": state.uid_validity, "new": uid_validity})
+        state.uid_validity = uid_validity
+        state.last_uid = 0
+    return state
+
+
+def new_uids(mail, last_uid):
+    """UIDs above ``last_uid``, in ascending order."""
+    with track_call('imap', 'search'):
+        status, data = mail.uid('search', None, f'UID {last_uid + 1}:*')
+    if status != 'OK':
+        raise imaplib.IMAP4.error(f"UID SEARCH failed: {data}")
+    # "n:*" always matches the highest UID, even when that is below n
+    return sorted((uid for uid in data[0].split() if int(uid) > last_uid), key=int)
+
+
+def _ingest_one_by_one(session, state, messages):
+    """Fallback for a batch that failed as a whole: store what can be stored, skip the rest.
+
+    Only a message that fails on its own data is skipped; a database error
+    rolls back and propagates, leaving the watermark before that message.
+    """
+    processed = 0
+    for uid, message in messages:
+        try:
+            processed += ingest_batch(session, [message])
+        except DB_UNAVAILABLE_ERRORS:
+            session.rollback()
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.exception(f"IMAP message skipped: {e}", extra={"uid": uid})
+        state.last_uid = max(state.last_uid, uid)
+        session.commit()
+    return processed
+
+
+def sync_mailbox(mail, session, mailbox=IMAP_MAILBOX, batch_size=IMAP_BATCH_SIZE):
+    """Ingest every message that arrived in ``mailbox`` since the stored watermark.
+
+    Only UIDs above the watermark are searched and fetched, so a poll costs
+    O(new mail) regardless of mailbox size, and flags are never read or set.
+    Each batch commits together with the advanced watermark, so a crash
+    re-fetches at most one batch, and a database error (DB_UNAVAILABLE_ERRORS)
+    ends the poll with the watermark unmoved. Returns (new UIDs, messages stored).
+    """
+    state = load_sync_state(session, mailbox, *select_mailbox(mail, mailbox))
+    session.commit()
+    uids = new_uids(mail, state.last_uid)
+    processed = 0
+    for chunk in _chunks(uids, batch_size):
+        messages = fetch_batch(mail, chunk)
+        try:
+            processed += ingest_batch(session, [message for _, message in messages])
+            state.last_uid = int(chunk[-1])
+            session.commit()
+        except DB_UNAVAILABLE_ERRORS:
+            session.rollback()
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.exception(f"IMAP batch failed, retrying message by message: {e}",
+                             extra={"batch_size": len(chunk)})
+            processed += _ingest_one_by_one(session, state, messages)
+            # UIDs in the chunk that the server did not return were expunged
+            state.last_uid = max(state.last_uid, int(chunk[-1]))
+            session.commit()
+    return len(uids), processed
+
+
+def poll_inbound_and_process(batch_size=IMAP_BATCH_SIZE):
+    """IMAP poller that ingests new messages in batches of ``batch_size``.
+
+    See sync_mailbox. This is a minimal implementation; for production use
+    webhooks or robust mail parsing.
     """
     if not IMAP_HOST or not IMAP_USER:
-        print("IMAP not configured; skipping poll")
+        logger.debug("IMAP not configured; skipping poll")
         return 0
 
     try:
-        mail = imaplib.IMAP4_SSL(IMAP_HOST, IMAP_PORT)
-        mail.login(IMAP_USER, IMAP_PASS)
-        mail.select('inbox')
-        status, data = mail.search(None, '(UNSEEN)')
-        mail_ids = data[0].split()[:limit]
+        with track_call('imap', 'connect'):
+            mail = imaplib.IMAP4_SSL(IMAP_HOST, IMAP_PORT)
+            mail.login(IMAP_USER, IMAP_PASS)
         session = SessionLocal()
-        processed = 0
-        for mid in mail_ids:
-            status, msg_data = mail.fetch(mid, '(RFC822)')
-            raw = msg_data[0][1]
-            msg = email.message_from_bytes(raw)
-            message_id = msg.get('Message-ID')
-            subject = _decode_header_part(msg.get('Subject') or '')
-            from_ = _decode_header_part(msg.get('From') or '')
-            to = _decode_header_part(msg.get('To') or '')
-            # Get body
-            body = None
-            if msg.is_multipart():
-                for part in msg.walk():
-                    ctype = part.get_content_type()
-                    disp = str(part.get('Content-Disposition'))
-                    if ctype == 'text/plain' and 'attachment' not in disp:
-                        body = part.get_payload(decode=True).decode(errors='ignore')
-                        break
-            else:
-                body = msg.get_payload(decode=True).decode(errors='ignore')
-
-            # Deduplicate
-            existing = session.query(models.EmailMessage).filter_by(external_message_id=message_id).first()
-            if existing:
-                continue
-
-            # Save raw email
-            email_record = models.EmailMessage(
-                external_message_id=message_id,
-                direction='inbound',
-                subject=subject,
-                body_text=body,
-                sender=from_,
-                recipients=to
-            )
-            session.add(email_record)
-            session.commit()
-
-            
-            import re
-            m = re.search(r"<([^>]+)>", from_)
-            sender_email = m.group(1) if m else from_
-            consultant = session.query(models.Consultant).filter(models.Consultant.email == sender_email).first()
-
-            parsed = parse_status_from_text(body or '')
-
-            # Create StatusUpdate only if we detect useful info
-            if parsed.get('status_label') or parsed.get('status_pct'):
-                su = models.StatusUpdate(
-                    task_id=None,
-                    consultant_id=consultant.id if consultant else None,
-                    status_pct=parsed.get('status_pct'),
-                    status_label=parsed.get('status_label'),
-                    summary=parsed.get('summary'),
-                    blockers=parsed.get('blockers'),
-                    eta_date=parsed.get('eta_date'),
-                    source_email_id=email_record.id
-                )
-                session.add(su)
-                session.commit()
-
-            processed += 1
-        session.close()
-        mail.logout()
-        print(f"IMAP poll processed {processed} messages")
+        try:
+            new, processed = sync_mailbox(mail, session, IMAP_MAILBOX, batch_size)
+        finally:
+            session.close()
+            mail.logout()
+        # one aggregate event per poll rather than a line per message
+        logger.info("IMAP poll finished", extra={"mailbox": IMAP_MAILBOX, "new": new, "processed": processed})
         return processed
     except Exception as e:
-        print("IMAP poll error:", e)
+        logger.exception(f"IMAP poll failed: {e}")
         return 0
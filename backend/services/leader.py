@@ -0,0 +1,125 @@
+"""Database-backed leader election.
+
+Every worker process runs a LeaderElector for the same lease name; the one
+that holds the row in ``leader_leases`` is the leader. The leader renews the
+lease every LEADER_RENEW_SECONDS. If it dies, its lease expires after
+LEADER_LEASE_SECONDS and the next worker to try takes over. Acquire and renew
+are a single conditional UPDATE (or the INSERT that creates the row), so two
+workers can never both succeed.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+from backend.database import SessionLocal
+
+LEADER_LEASE_SECONDS = int(os.getenv("LEADER_LEASE_SECONDS", 30))
+LEADER_RENEW_SECONDS = int(os.getenv("LEADER_RENEW_SECONDS", 10))
+
+logger = logging.getLogger(__name__)
+
+
+def try_acquire(session, name, owner, lease_seconds=LEADER_LEASE_SECONDS):
+    """Take or renew lease ``name`` for ``owner``. Returns True if ``owner`` now holds it."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    updated = session.query(models.LeaderLease).filter(
+        models.LeaderLease.name == name,
+        or_(models.LeaderLease.owner == owner, models.LeaderLease.expires_at < now)
+    ).update({"owner": owner, "expires_at": expires_at}, synchronize_session=False)
+    if updated:
+        session.commit()
+        return True
+    session.rollback()
+    if session.query(models.LeaderLease.name).filter(models.LeaderLease.name == name).first():
+        return False
+    try:
+        session.add(models.LeaderLease(name=name, owner=owner, expires_at=expires_at))
+        session.commit()
+        return True
+    except IntegrityError:
+        session.rollback()  # another worker created it first
+        return False
+
+
+def release(session, name, owner):
+    session.query(models.LeaderLease).filter(
+        models.LeaderLease.name == name,
+        models.LeaderLease.owner == owner
+    ).delete(synchronize_session=False)
+    session.commit()
+
+
+class LeaderElector:
+    """Background thread that keeps trying to hold lease ``name``.
+
+    ``on_elected`` runs when this process becomes leader and ``on_demoted``
+    when it loses the lease (e.g. after a stall longer than the lease).
+    """
+
+    def __init__(self, name, on_elected, on_demoted, lease_seconds=LEADER_LEASE_SECONDS,
+                 renew_seconds=LEADER_RENEW_SECONDS):
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop campaigning and hand the lease back so another worker can take over at once."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.is_leader:
+            self._set_leader(False)
+            session = SessionLocal()
+            try:
+                release(session, self.name, self.owner)
+            finally:
+                session.close()
+
+    def _set_leader(self, leading):
+        if leading == self.is_leader:
+            return
+        self.is_leader = leading
+        if leading:
+            logger.info(f"{self.owner} elected leader for {self.name}")
+            self.on_elected()
+        else:
+            logger.warning(f"{self.owner} is no longer leader for {self.name}")
+            self.on_demoted()
+
+    def _run(self):
+        while not self._stop.is_set():
+            session = SessionLocal()
+            try:
+                leading = try_acquire(session, self.name, self.owner, self.lease_seconds)
+            except Exception as e:
+                # Can't confirm the lease, so stop acting as leader until we can
+                logger.error(f"Leader lease check for {self.name} failed: {e}")
+                session.rollback()
+                leading = False
+            finally:
+                session.close()
+            try:
+                self._set_leader(leading)
+            except Exception as e:
+                logger.exception(f"Leader callback for {self.name} failed: {e}")
+            self._stop.wait(self.renew_seconds)
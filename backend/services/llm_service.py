@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+import openai
+from dotenv import load_dotenv
+from backend.services.metrics import Counter, track_call
+
+load_dotenv()
+# "azure" talks to Azure OpenAI; "stub" returns canned replies locally for offline testing
+LLM_BACKEND = os.getenv("LLM_BACKEND", "azure")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# Per attempt; the client retries a failed or timed-out attempt LLM_MAX_RETRIES times
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+# Whole call, retries included: every attempt plus the client's longest backoff (8s) between them
+LLM_DEADLINE_SECONDS = float(os.getenv(
+    "LLM_DEADLINE_SECONDS", LLM_TIMEOUT_SECONDS * (LLM_MAX_RETRIES + 1) + 8 * LLM_MAX_RETRIES))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 1024))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 3600))
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", 0.5))
+
+logger = logging.getLogger(__name__)
+
+llm_cache_requests = Counter("llm_cache_requests_total", "LLM response cache requests", ("result",))
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                llm_cache_requests.inc("hit")
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            llm_cache_requests.inc("miss")
+            return None
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class AzureChatBackend:
+    """Azure OpenAI chat completions over one shared async client."""
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = openai.AsyncAzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_VERSION"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_retries=LLM_MAX_RETRIES,
+            )
+        return self._client
+
+    async def complete(self, messages, max_tokens, temperature):
+        response = await self.client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_DEPLOYMENT"),  # Your deployment name
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return response.choices[0].message.content
+
+
+class StubChatBackend:
+    """Offline backend: waits ``latency`` seconds and returns a deterministic reply."""
+
+    def __init__(self, latency=LLM_STUB_LATENCY):
+        self.latency = latency
+        self.calls = 0
+
+    async def complete(self, messages, max_tokens, temperature):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(messages[-1]["content"].encode()).hexdigest()[:8]
+        return (
+            f"Thanks for the update (ref {digest}). Please keep the task moving and "
+            f"escalate any blockers promptly.\n\nBest Regards,\nSivasubramanian Murugesan"
+        )
+
+
+_backend = StubChatBackend() if LLM_BACKEND == "stub" else AzureChatBackend()
+_cache = TTLCache(LLM_CACHE_SIZE, LLM_CACHE_TTL)
+_semaphores = weakref.WeakKeyDictionary()  # one per event loop
+_inflight = {}
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+    _cache.clear()
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return sem
+
+
+def _cache_key(messages, max_tokens, temperature):
+    payload = json.dumps([os.getenv("AZURE_OPENAI_DEPLOYMENT"), messages, max_tokens, temperature], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def complete_chat(messages, max_tokens=300, temperature=0.7):
+    """Return the completion for ``messages``, serving repeats from the cache.
+
+    Identical requests already in flight share one upstream call, at most
+    LLM_MAX_CONCURRENCY calls run at once. Each attempt is bounded by
+    LLM_TIMEOUT_SECONDS and the call as a whole, retries included, by
+    LLM_DEADLINE_SECONDS.
+    """
+    key = _cache_key(messages, max_tokens, temperature)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        async with _get_semaphore():
+            with track_call("llm", "chat_completion"):
+                text = await asyncio.wait_for(
+                    _backend.complete(messages, max_tokens, temperature), LLM_DEADLINE_SECONDS
+                )
+        _cache.set(key, text)
+        future.set_result(text)
+        return text
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else is waiting
+        raise
+    finally:
+        del _inflight[key]
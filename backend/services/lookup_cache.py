@@ -0,0 +1,173 @@
+"""Bounded, write-invalidated LRU cache for Consultant-by-email and Task-by-id.
+
+Entries are column snapshots, not ORM instances, so nothing session-bound is
+shared between threads. A hit is attached to the caller's session with
+``merge(load=False)``, without a SELECT, and relationships lazy-load as usual.
+The snapshot may be stale, though, and the session takes it for the row's
+committed state: a write through it that happens to match the snapshot is
+dropped as a no-op. Objects from get_task() and get_consultant_by_email() are
+therefore read-only. Code that modifies a task or consultant loads it with
+``db.get()`` or a query.
+
+Mapper ``after_insert``/``after_update``/``after_delete`` events drop the
+affected keys when a session flushes the change, and again after it commits
+so a concurrent reader can't re-cache the pre-commit row. Bulk
+``query.update()`` bypasses mapper events; call clear() after one that
+touches these tables. Entries also expire after LOOKUP_CACHE_TTL seconds so
+other workers' writes show up. Hits and misses are counted on /metrics.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from backend import models
+from backend.services.metrics import Counter
+
+LOOKUP_CACHE_SIZE = int(os.getenv("LOOKUP_CACHE_SIZE", 10000))
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", 300))
+
+lookup_cache_requests = Counter(
+    "lookup_cache_requests_total", "Consultant/task lookup cache requests", ("cache", "result"))
+
+
+class LRUCache:
+    def __init__(self, name, maxsize=LOOKUP_CACHE_SIZE, ttl=LOOKUP_CACHE_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                value = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                value = None
+        lookup_cache_requests.inc(self.name, "hit" if value is not None else "miss")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+consultants_by_email = LRUCache("consultant_by_email")
+tasks_by_id = LRUCache("task_by_id")
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def _attach(db, model, snapshot):
+    obj = model(**snapshot)
+    make_transient_to_detached(obj)  # as if loaded by a query: no pending changes
+    return db.merge(obj, load=False)
+
+
+def get_consultant_by_email(db, email):
+    """The Consultant with ``email`` attached to ``db``, or None. Read-only; see the module docstring."""
+    snapshot = consultants_by_email.get(email)
+    if snapshot is not None:
+        return _attach(db, models.Consultant, snapshot)
+    consultant = db.query(models.Consultant).filter(models.Consultant.email == email).first()
+    if consultant is not None:
+        consultants_by_email.put(email, _snapshot(consultant))
+    return consultant
+
+
+def get_consultant_ids(db, emails):
+    """{email: consultant id} for the emails that exist, querying only the ones not cached."""
+    ids = {}
+    missing = []
+    for email in set(emails):
+        snapshot = consultants_by_email.get(email)
+        if snapshot is not None:
+            ids[email] = snapshot["id"]
+        else:
+            missing.append(email)
+    if missing:
+        for consultant in db.query(models.Consultant).filter(models.Consultant.email.in_(missing)):
+            consultants_by_email.put(consultant.email, _snapshot(consultant))
+            ids[consultant.email] = consultant.id
+    return ids
+
+
+def get_task(db, task_id):
+    """The Task with ``task_id`` attached to ``db``, or None. Read-only; see the module docstring."""
+    snapshot = tasks_by_id.get(task_id)
+    if snapshot is not None:
+        return _attach(db, models.Task, snapshot)
+    task = db.get(models.Task, task_id)
+    if task is not None:
+        tasks_by_id.put(task_id, _snapshot(task))
+    return task
+
+
+def clear():
+    consultants_by_email.clear()
+    tasks_by_id.clear()
+
+
+# --- invalidation -------------------------------------------------------------
+
+def _consultant_keys(target):
+    # the email as loaded and as written, in case the write changed it
+    history = inspect(target).attrs.email.history
+    return {("consultant", email) for email in (*history.deleted, *history.unchanged, *history.added) if email}
+
+
+def _on_consultant_write(mapper, connection, target):
+    keys = _consultant_keys(target)
+    for _, email in keys:
+        consultants_by_email.invalidate(email)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("lookup_cache_dirty", set()).update(keys)
+
+
+def _on_task_write(mapper, connection, target):
+    tasks_by_id.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("lookup_cache_dirty", set()).add(("task", target.id))
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(models.Consultant, _event, _on_consultant_write)
+    event.listen(models.Task, _event, _on_task_write)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for kind, key in session.info.pop("lookup_cache_dirty", ()):
+        (consultants_by_email if kind == "consultant" else tasks_by_id).invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("lookup_cache_dirty", None)
@@ -0,0 +1,86 @@
+"""Link inbound replies to the task email they answer.
+
+Outbound task emails get a Message-ID we generate (stored as the
+EmailMessage's external_message_id, and as thread_id for the thread root),
+so a reply's In-Reply-To / References headers resolve to the task with one
+lookup on the unique external_message_id index. Replies whose client dropped
+those headers fall back to the ``[Task: <name>]`` tag (subject_tag) that every
+task email carries in its subject.
+"""
+import os
+import re
+from email.utils import make_msgid
+
+from backend import models
+
+_sender = os.getenv("ACS_SENDER_ADDRESS") or ""
+EMAIL_MESSAGE_ID_DOMAIN = os.getenv("EMAIL_MESSAGE_ID_DOMAIN") or _sender.rpartition("@")[2] or "ai-pm.local"
+
+MESSAGE_ID_RE = re.compile(r"<[^<>\s]+>")
+SUBJECT_TAG_RE = re.compile(r"\[Task:\s*([^\]]+?)\s*\]")
+
+
+def subject_tag(task_name):
+    return f"[Task: {task_name}]"
+
+
+def new_message_id(task_id):
+    return make_msgid(idstring=f"task{task_id}", domain=EMAIL_MESSAGE_ID_DOMAIN)
+
+
+def reference_ids(in_reply_to, references):
+    """Message-IDs a reply points at, most specific first: In-Reply-To, then References newest to oldest."""
+    ids = MESSAGE_ID_RE.findall(in_reply_to or "") + MESSAGE_ID_RE.findall(references or "")[::-1]
+    return list(dict.fromkeys(ids))
+
+
+def subject_task_name(subject):
+    m = SUBJECT_TAG_RE.search(subject or "")
+    return m.group(1) if m else None
+
+
+def resolve_threads(session, messages):
+    """(task_id, thread_id) for each parsed inbound message, either possibly None.
+
+    Runs at most two queries for the whole batch: one IN lookup of every
+    referenced Message-ID, and one of the subject-tag task names for messages
+    whose references matched nothing we sent.
+    """
+    refs = [reference_ids(m.get("in_reply_to"), m.get("references")) for m in messages]
+    all_refs = {ref for message_refs in refs for ref in message_refs}
+    known = {}
+    if all_refs:
+        known = {
+            row.external_message_id: (row.linked_task_id, row.thread_id)
+            for row in session.query(
+                models.EmailMessage.external_message_id,
+                models.EmailMessage.linked_task_id,
+                models.EmailMessage.thread_id,
+            ).filter(models.EmailMessage.external_message_id.in_(all_refs))
+        }
+
+    resolved = []
+    for message, message_refs in zip(messages, refs):
+        match = next((known[ref] for ref in message_refs if ref in known), None)
+        if match:
+            task_id, thread_id = match
+            resolved.append((task_id, thread_id or message_refs[0]))
+        else:
+            # Unknown thread: the oldest reference is the root a later reply will cite
+            root = message_refs[-1] if message_refs else message.get("message_id")
+            resolved.append((None, root))
+
+    names = {subject_task_name(m.get("subject")) for m, (task_id, _) in zip(messages, resolved) if task_id is None}
+    names.discard(None)
+    if names:
+        # Names aren't unique; the newest task with the name wins
+        by_name = dict(
+            session.query(models.Task.name, models.Task.id)
+            .filter(models.Task.name.in_(names))
+            .order_by(models.Task.id)
+        )
+        resolved = [
+            (by_name.get(subject_task_name(m.get("subject"))), thread_id) if task_id is None else (task_id, thread_id)
+            for m, (task_id, thread_id) in zip(messages, resolved)
+        ]
+    return resolved
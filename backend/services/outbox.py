@@ -0,0 +1,221 @@
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_, update
+from backend.database import SessionLocal
+from backend import models
+from backend.services.email_service import send_emails
+from backend.services.mail_threads import new_message_id
+
+load_dotenv()
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('OUTBOX_RETRY_BASE_SECONDS', 30))
+OUTBOX_POLL_SECONDS = int(os.getenv('OUTBOX_POLL_SECONDS', 5))
+# How long a claimed ('sending') row belongs to the process that claimed it;
+# after that its claim is presumed dead and any process may take it over
+OUTBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv('OUTBOX_CLAIM_TIMEOUT_SECONDS', 300))
+
+logger = logging.getLogger(__name__)
+
+_drain_lock = threading.Lock()
+
+
+def enqueue_email(db, subject, body, to_emails, html_body=None, task_id=None, consultant_id=None):
+    """Record an outbound EmailMessage and its outbox row in the caller's transaction.
+
+    Nothing is sent here; the caller commits and the worker pool delivers it.
+    """
+    return enqueue_emails(db, [{
+        "subject": subject,
+        "body": body,
+        "to_emails": to_emails,
+        "html_body": html_body,
+        "task_id": task_id,
+        "consultant_id": consultant_id,
+    }])[0]
+
+
+def enqueue_emails(db, items):
+    """Bulk form of enqueue_email: one flush for all EmailMessage rows, one for the outbox rows.
+
+    Emails about a task get their own Message-ID so replies can be matched
+    back to the task (see mail_threads).
+    """
+    message_ids = [new_message_id(item["task_id"]) if item.get("task_id") else None for item in items]
+    messages = [
+        models.EmailMessage(
+            external_message_id=message_id,
+            thread_id=message_id,
+            direction='outbound',
+            subject=item["subject"],
+            body_text=item["body"],
+            sender=None,
+            recipients=','.join(item["to_emails"]),
+            linked_task_id=item.get("task_id"),
+            linked_consultant_id=item.get("consultant_id")
+        )
+        for item, message_id in zip(items, message_ids)
+    ]
+    db.add_all(messages)
+    db.flush()  # Get message ids
+    now = datetime.utcnow()
+    queued = [
+        models.OutboxEmail(
+            email_message_id=em.id,
+            subject=item["subject"],
+            body_text=item["body"],
+            html_body=item.get("html_body"),
+            recipients=','.join(item["to_emails"]),
+            message_id=em.external_message_id,
+            status=models.OutboxStatusEnum.PENDING,
+            attempts=0,
+            next_attempt_at=now
+        )
+        for item, em in zip(items, messages)
+    ]
+    db.add_all(queued)
+    db.flush()
+    return queued
+
+
+def _expired_claim(now):
+    return and_(models.OutboxEmail.status == models.OutboxStatusEnum.SENDING, models.OutboxEmail.next_attempt_at <= now)
+
+
+def _claimable(now):
+    # due pending rows, plus rows whose claimer stopped before finishing them
+    # and that have attempts left
+    return or_(
+        and_(models.OutboxEmail.status == models.OutboxStatusEnum.PENDING, models.OutboxEmail.next_attempt_at <= now),
+        and_(_expired_claim(now), models.OutboxEmail.attempts < OUTBOX_MAX_ATTEMPTS),
+    )
+
+
+def _fail_exhausted_claims(session, now):
+    """Mark expired claims that already used OUTBOX_MAX_ATTEMPTS as failed; the caller commits."""
+    n = session.query(models.OutboxEmail).filter(
+        _expired_claim(now), models.OutboxEmail.attempts >= OUTBOX_MAX_ATTEMPTS
+    ).update({
+        models.OutboxEmail.status: models.OutboxStatusEnum.FAILED,
+        models.OutboxEmail.last_error: "Claim expired on the last attempt",
+    }, synchronize_session=False)
+    if n:
+        logger.error(f"{n} outbox items failed permanently: claim expired after {OUTBOX_MAX_ATTEMPTS} attempts")
+    return n
+
+
+def _claim_batch(session, limit):
+    """Mark up to ``limit`` due rows as 'sending' and return the ones this call won.
+
+    Candidates are read first, then claimed with one conditional UPDATE that
+    re-checks the claimable condition. A row another process claimed in
+    between no longer matches, so it is left out and never sent twice. For
+    'sending' rows, next_attempt_at holds the claim's expiry; an expired one
+    that is out of attempts is marked failed instead of claimed.
+    """
+    now = datetime.utcnow()
+    _fail_exhausted_claims(session, now)
+    ids = [row[0] for row in session.query(models.OutboxEmail.id).filter(_claimable(now)).order_by(
+        models.OutboxEmail.next_attempt_at, models.OutboxEmail.id
+    ).limit(limit)]
+    if not ids:
+        session.commit()
+        return []
+    claim = update(models.OutboxEmail).where(models.OutboxEmail.id.in_(ids), _claimable(now)).values(
+        status=models.OutboxStatusEnum.SENDING,
+        attempts=models.OutboxEmail.attempts + 1,
+        next_attempt_at=now + timedelta(seconds=OUTBOX_CLAIM_TIMEOUT_SECONDS),
+    ).execution_options(synchronize_session=False)
+    if session.get_bind().dialect.update_returning:
+        claimed = [row[0] for row in session.execute(claim.returning(models.OutboxEmail.id))]
+    else:
+        claimed = [id_ for id_ in ids if session.execute(claim.where(models.OutboxEmail.id == id_)).rowcount]
+    session.commit()
+    if not claimed:
+        return []
+    return session.query(models.OutboxEmail).filter(models.OutboxEmail.id.in_(claimed)).order_by(models.OutboxEmail.id).all()
+
+
+def drain_outbox(limit=OUTBOX_BATCH_SIZE):
+    """Deliver every due outbox row, ``limit`` rows per concurrent email batch.
+
+    Failed sends are rescheduled with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS is reached, after which the row is marked failed.
+    Returns the number of rows delivered.
+    """
+    if not _drain_lock.acquire(blocking=False):
+        return 0
+    session = SessionLocal()
+    sent = 0
+    try:
+        while True:
+            rows = _claim_batch(session, limit)
+            if not rows:
+                break
+            sent += _deliver_batch(rows)
+            session.commit()
+            if len(rows) < limit:
+                break
+        return sent
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Outbox drain error: {e}", exc_info=True)
+        return sent
+    finally:
+        session.close()
+        _drain_lock.release()
+
+
+def _deliver_batch(rows):
+    results = send_emails([
+        {"subject": r.subject, "body": r.body_text, "to_emails": r.recipients.split(','), "html_body": r.html_body,
+         "headers": {"Message-ID": r.message_id} if r.message_id else None}
+        for r in rows
+    ])
+    sent = 0
+    for row, result in zip(rows, results):
+        if not isinstance(result, Exception):
+            row.status = models.OutboxStatusEnum.SENT
+            row.provider_message_id = result['id'] if result else None
+            row.sent_at = datetime.utcnow()
+            row.last_error = None
+            sent += 1
+            continue
+        row.last_error = str(result)
+        if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+            row.status = models.OutboxStatusEnum.FAILED
+            logger.error(f"Outbox item {row.id} failed permanently after {row.attempts} attempts: {result}")
+        else:
+            row.status = models.OutboxStatusEnum.PENDING
+            delay = OUTBOX_RETRY_BASE_SECONDS * (2 ** (row.attempts - 1))
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Outbox item {row.id} attempt {row.attempts} failed, retrying in {delay}s: {result}")
+    return sent
+
+
+def kick():
+    """Start a drain in the background so freshly committed items go out without waiting for the next poll."""
+    threading.Thread(target=drain_outbox, name='outbox-drain', daemon=True).start()
+
+
+def recover_in_flight():
+    """Return rows whose claim expired (their process crashed mid-send) to the pending queue.
+
+    Rows still within OUTBOX_CLAIM_TIMEOUT_SECONDS are left alone: another
+    worker may be sending them right now. Rows out of attempts are marked
+    failed. Returns the number requeued.
+    """
+    session = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        _fail_exhausted_claims(session, now)
+        n = session.query(models.OutboxEmail).filter(_expired_claim(now)).update(
+            {models.OutboxEmail.status: models.OutboxStatusEnum.PENDING}, synchronize_session=False
+        )
+        session.commit()
+        return n
+    finally:
+        session.close()
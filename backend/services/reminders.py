@@ -0,0 +1,145 @@
+"""Task reminders: persisted schedule plus one periodic sweeper.
+
+Each TaskReminder stores its next due time (``next_run_at``, naive UTC). The
+sweeper runs once a minute, claims every reminder that is due, groups them by
+assignee, queues one email per assignee and task through the outbox in a
+single pass and advances each reminder to its next occurrence. Each email is
+about one task, so it gets that task's Message-ID and subject tag and a reply
+threads back to it (see mail_threads). Nothing lives in the scheduler's memory, so reminders survive a
+restart and the scheduler's job count stays constant however many exist.
+"""
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy.orm import selectinload
+
+from backend import models
+from backend.database import SessionLocal
+from backend.services import outbox
+from backend.services.mail_threads import subject_tag
+
+REMINDER_TIMEZONE = os.getenv("REMINDER_TIMEZONE", "Asia/Kolkata")
+REMINDER_SWEEP_BATCH_SIZE = int(os.getenv("REMINDER_SWEEP_BATCH_SIZE", 1000))
+
+logger = logging.getLogger(__name__)
+
+
+def next_run_after(reminder_time, task, after=None, tz_name=REMINDER_TIMEZONE):
+    """Next daily occurrence of ``reminder_time`` strictly after ``after`` (naive UTC).
+
+    ``reminder_time`` is wall-clock time in ``tz_name``; runs are limited to the
+    task's start/end dates, read in the same timezone. Returns naive UTC, or
+    None once the task's end date has passed.
+    """
+    tz = pytz.timezone(tz_name)
+    after = after or datetime.utcnow()
+    local_after = pytz.utc.localize(after).astimezone(tz)
+    start = tz.localize(task.start_date) if task.start_date else None
+    day = max(local_after.date(), start.date()) if start else local_after.date()
+    candidate = tz.localize(datetime.combine(day, reminder_time))
+    while candidate <= local_after or (start and candidate < start):
+        day += timedelta(days=1)
+        candidate = tz.localize(datetime.combine(day, reminder_time))
+    if task.end_date and candidate > tz.localize(task.end_date):
+        return None
+    return candidate.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def reminder_email(consultant, task):
+    body = (
+        f"Hello {consultant.name},\n\n"
+        f"This is a reminder to provide an update on your assigned task.\n\n"
+        f"Task Name: {task.name}\n"
+        f"Description: {task.description}\n"
+        f"Start Date: {task.start_date}\n"
+        f"End Date: {task.end_date}\n\n"
+        f"Please share your progress, any blockers, or questions you might have.\n\n"
+        f"Kindly ignore if already updated.\n\n"
+        f"Best regards,\n"
+        f"Sivasubramanian Murugesan"
+    )
+    return {
+        "subject": f"{subject_tag(task.name)} Task Update Reminder",
+        "body": body,
+        "to_emails": [consultant.email],
+        "task_id": task.id,
+        "consultant_id": consultant.id,
+    }
+
+
+def sweep_due_reminders(now=None, batch_size=REMINDER_SWEEP_BATCH_SIZE):
+    """Send every reminder due at ``now`` (naive UTC) and schedule its next run.
+
+    Works through due reminders ``batch_size`` at a time; each batch's emails
+    and schedule updates commit together, so a crash never sends a reminder
+    twice or skips one. A reminder missed during downtime is sent once and then
+    moved to its next future occurrence. Returns the number of emails queued.
+    """
+    now = now or datetime.utcnow()
+    session = SessionLocal()
+    queued = 0
+    try:
+        while True:
+            due = session.query(models.TaskReminder).options(
+                selectinload(models.TaskReminder.task).selectinload(models.Task.consultants)
+            ).filter(
+                models.TaskReminder.is_active == True,  # noqa: E712
+                models.TaskReminder.next_run_at <= now
+            ).order_by(models.TaskReminder.next_run_at, models.TaskReminder.id).limit(batch_size).all()
+            if not due:
+                break
+
+            # One email per assignee and task, each threaded to its task
+            by_consultant = OrderedDict()
+            for reminder in due:
+                for consultant in reminder.task.consultants:
+                    tasks = by_consultant.setdefault(consultant.id, (consultant, []))[1]
+                    if reminder.task not in tasks:
+                        tasks.append(reminder.task)
+                reminder.last_sent_at = now
+                reminder.next_run_at = next_run_after(reminder.reminder_time, reminder.task, now)
+            emails = [
+                reminder_email(consultant, task)
+                for consultant, tasks in by_consultant.values() for task in tasks
+            ]
+            if emails:
+                outbox.enqueue_emails(session, emails)
+            session.commit()
+            queued += len(emails)
+            logger.info(f"Reminder sweep: {len(due)} reminders due, {len(emails)} emails queued")
+            if len(due) < batch_size:
+                break
+    except Exception as e:
+        session.rollback()
+        logger.exception(f"Reminder sweep failed: {e}")
+    finally:
+        session.close()
+    if queued:
+        outbox.kick()
+    return queued
+
+
+def rehydrate_reminders():
+    """Fill in ``next_run_at`` for active reminders that have none.
+
+    Covers reminders created before the column existed; run at startup.
+    """
+    session = SessionLocal()
+    try:
+        pending = session.query(models.TaskReminder).options(
+            selectinload(models.TaskReminder.task)
+        ).filter(
+            models.TaskReminder.is_active == True,  # noqa: E712
+            models.TaskReminder.next_run_at.is_(None),
+            models.TaskReminder.last_sent_at.is_(None)
+        ).all()
+        for reminder in pending:
+            reminder.next_run_at = next_run_after(reminder.reminder_time, reminder.task)
+        session.commit()
+        if pending:
+            logger.info(f"Scheduled {len(pending)} reminders without a next run time")
+    finally:
+        session.close()
@@ -1,16 +1,24 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING, STATE_STOPPED
 from apscheduler.triggers.cron import CronTrigger
 from pytz import timezone as pytz_timezone
+from sqlalchemy import select, insert, func, and_
 from sqlalchemy.orm import Session
 from backend.models import SchedulerConfig
 import logging
+import os
 from datetime import datetime, timedelta
 from backend.services.imap_service import poll_inbound_and_process
-from backend.services.email_service import send_email
+from backend.services import change_feed, outbox, reminders
+from backend.services.leader import LeaderElector
 from backend.database import SessionLocal
 from backend import models
 from backend.utils.templates import task_assignment_template
 
+logger = logging.getLogger(__name__)
+
+WEEKLY_REPORT_BATCH_SIZE = int(os.getenv('WEEKLY_REPORT_BATCH_SIZE', 500))
+
 sched = BackgroundScheduler()
 
 def start_scheduler(app=None):
@@ -23,43 +31,114 @@ def start_scheduler(app=None):
     # Weekly performance on Friday 16:00
     sched.add_job(weekly_performance_job, 'cron', day_of_week='fri', hour=16, minute=0, id='weekly_report')
 
+    # Task reminders: one sweeper for every reminder, schedule kept in the database
+    reminders.rehydrate_reminders()
+    sched.add_job(reminders.sweep_due_reminders, 'cron', second=0, id='reminder_sweep', max_instances=1, coalesce=True)
+
+    # Drain the outbound email queue
+    outbox.recover_in_flight()
+    sched.add_job(outbox.drain_outbox, 'interval', seconds=outbox.OUTBOX_POLL_SECONDS, id='outbox_drain', max_instances=1, coalesce=True)
+
+    # Trim the change feed to its retention window
+    sched.add_job(change_feed.prune_changes, 'cron', hour=3, minute=0, id='change_feed_prune', coalesce=True)
+
     sched.start()
-    print('Scheduler started at', datetime.utcnow())
+    logger.info('Scheduler started')
+
+
+def _on_elected():
+    if sched.state == STATE_PAUSED:
+        # Requeue what the previous leader left half-sent while we were paused
+        outbox.recover_in_flight()
+        sched.resume()
+        logger.info('Scheduler resumed')
+    elif sched.state == STATE_STOPPED:
+        start_scheduler()
+
+
+def _on_demoted():
+    if sched.state == STATE_RUNNING:
+        sched.pause()
+        logger.info('Scheduler paused')
+
+
+# Every worker campaigns; only the one holding the lease runs the jobs above
+scheduler_leader = LeaderElector('scheduler', on_elected=_on_elected, on_demoted=_on_demoted)
 
 
 def daily_reminder_job():
-    print('Daily reminder job running at', datetime.utcnow())
+    logger.info('Daily reminder job running')
 
 
-def weekly_performance_job():
-    print('Weekly performance job running at', datetime.utcnow())
+def weekly_performance_job(batch_size=WEEKLY_REPORT_BATCH_SIZE):
+    """Write one PerformanceReport per consultant for the past week and queue its email.
+
+    Update counts come from a single GROUP BY over the reporting week. Reports
+    and their outbox emails are inserted together per batch, and consultants
+    that already have a report for the week are skipped, so an interrupted run
+    resumes without duplicating reports. Delivery fans out through the outbox.
+    """
+    logger.info('Weekly performance job running')
+    today = datetime.utcnow().date()
+    week_start = today - timedelta(days=7)
+    window_start = datetime.combine(week_start, datetime.min.time())
+    window_end = datetime.combine(today + timedelta(days=1), datetime.min.time())
+
     session = SessionLocal()
-    # naive weekly report: for each consultant generate a simple report and email
-    consultants = session.query(models.Consultant).all()
-    for c in consultants:
-        # compute a simple score based on number of updates
-        updates = session.query(models.StatusUpdate).filter(models.StatusUpdate.consultant_id == c.id).all()
-        n_updates = len(updates)
-        score = min(100, n_updates * 10)
-        # create report row
-        report = models.PerformanceReport(
-            consultant_id=c.id,
-            week_start=str((datetime.utcnow() - timedelta(days=7)).date()),
-            week_end=str(datetime.utcnow().date()),
-            days_absent=0,
-            tasks_summary_json='{}',
-            score=score
+    try:
+        already_reported = select(models.PerformanceReport.consultant_id).where(
+            models.PerformanceReport.week_start == str(week_start),
+            models.PerformanceReport.week_end == str(today)
         )
-        session.add(report)
-        session.commit()
-        # send a basic email
-        subject = f"Your weekly performance summary ({report.week_start}–{report.week_end})"
-        body = f"Hello {c.name},\n\nThis is your automated weekly report. Score: {score}/100.\nUpdates received: {n_updates}\n\nRegards\nPM System"
-        try:
-            send_email(subject, body, [c.email])
-        except Exception as e:
-            print('Failed to send weekly report to', c.email, e)
-    session.close()
+        rows = session.query(
+            models.Consultant.id,
+            models.Consultant.name,
+            models.Consultant.email,
+            func.count(models.StatusUpdate.id)
+        ).outerjoin(
+            models.StatusUpdate,
+            and_(
+                models.StatusUpdate.consultant_id == models.Consultant.id,
+                models.StatusUpdate.created_at >= window_start,
+                models.StatusUpdate.created_at < window_end
+            )
+        ).filter(
+            models.Consultant.id.notin_(already_reported)
+        ).group_by(models.Consultant.id).order_by(models.Consultant.id).all()
+
+        for i in range(0, len(rows), batch_size):
+            chunk = rows[i:i + batch_size]
+            reports = []
+            emails = []
+            for consultant_id, name, email, n_updates in chunk:
+                # compute a simple score based on number of updates this week
+                score = min(100, n_updates * 10)
+                reports.append({
+                    "consultant_id": consultant_id,
+                    "week_start": str(week_start),
+                    "week_end": str(today),
+                    "days_absent": 0,
+                    "tasks_summary_json": '{}',
+                    "score": score
+                })
+                emails.append({
+                    "subject": f"Your weekly performance summary ({week_start}–{today})",
+                    "body": f"Hello {name},\n\nThis is your automated weekly report. Score: {score}/100.\nUpdates received: {n_updates}\n\nRegards\nPM System",
+                    "to_emails": [email],
+                    "consultant_id": consultant_id,
+                })
+            # reports and their emails commit together: this batch is the checkpoint
+            session.execute(insert(models.PerformanceReport), reports)
+            outbox.enqueue_emails(session, emails)
+            session.commit()
+        logger.info('Weekly performance job finished', extra={'reports_queued': len(rows), 'week_start': str(week_start)})
+    except Exception as e:
+        session.rollback()
+        logger.exception(f'Weekly performance job failed: {e}')
+        raise
+    finally:
+        session.close()
+    outbox.kick()
 
 
 def get_scheduler_config(db: Session):
@@ -72,23 +151,25 @@ def get_scheduler_config(db: Session):
     return config
 
 def schedule_jobs(config: SchedulerConfig, send_daily_reminders, send_weekly_reports):
-    sched.remove_all_jobs()
+    # Replace only these two jobs; the sweeper, outbox, IMAP and prune jobs keep running
     tz = pytz_timezone(config.timezone or "UTC")
     # Daily reminder
     hour, minute = map(int, config.daily.split(":"))
     sched.add_job(
         send_daily_reminders,
         CronTrigger(hour=hour, minute=minute, timezone=tz),
-        id="daily_reminder"
+        id="daily_reminder",
+        replace_existing=True
     )
     # Weekly report (Friday by default)
     hour, minute = map(int, config.weekly.split(":"))
     sched.add_job(
         send_weekly_reports,
         CronTrigger(day_of_week="fri", hour=hour, minute=minute, timezone=tz),
-        id="weekly_report"
+        id="weekly_report",
+        replace_existing=True
     )
-    logging.info("Scheduled jobs updated.")
+    logger.info("Scheduled jobs updated.")
 
 def reschedule_jobs(db: Session, send_daily_reminders, send_weekly_reports):
     config = get_scheduler_config(db)
@@ -0,0 +1,149 @@
+"""Bulk task import: many tasks and their assignees in one transaction.
+
+Rows come from JSON (a list of TaskCreate objects) or CSV with the columns
+``name, description, start_date, end_date, assignees``, where ``assignees`` is
+a ``;``-separated list of ``Name <email>`` or bare emails. Each row is
+validated on its own; invalid rows are reported and skipped while the rest
+import.
+
+Per chunk of IMPORT_CHUNK_SIZE rows the import runs one consultant upsert
+(INSERT ... ON CONFLICT (email) ... RETURNING id, which creates missing
+consultants and returns every id; existing names are left alone), one
+multi-row task INSERT ... RETURNING id and one executemany for the
+assignment rows, instead of the 2+N round trips per task of POST /tasks/.
+"""
+import csv
+import io
+import os
+import re
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend import models, schemas
+from backend.services import change_feed, dashboard_cache
+
+TASK_IMPORT_MAX_ROWS = int(os.getenv("TASK_IMPORT_MAX_ROWS", 10000))
+IMPORT_CHUNK_SIZE = 500
+
+ASSIGNEE_RE = re.compile(r"^\s*(?:(.*?)\s*<([^<>\s]+)>|([^<>\s]+))\s*$")
+
+
+def _parse_assignees(value):
+    assignees = []
+    for item in (value or "").split(";"):
+        if not item.strip():
+            continue
+        m = ASSIGNEE_RE.match(item)
+        if not m:
+            raise ValueError(f"Cannot parse assignee {item.strip()!r}")
+        email = m.group(2) or m.group(3)
+        assignees.append({"name": m.group(1) or email.split("@")[0], "email": email})
+    return assignees
+
+
+def rows_from_csv(text):
+    """CSV text -> list of dicts in the TaskCreate shape (unvalidated)."""
+    rows = []
+    for record in csv.DictReader(io.StringIO(text)):
+        record = {(k or "").strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in record.items()}
+        try:
+            assignees = _parse_assignees(record.get("assignees"))
+        except ValueError as e:
+            rows.append({"_error": str(e)})
+            continue
+        rows.append({
+            "name": record.get("name") or None,
+            "description": record.get("description") or None,
+            "start_date": record.get("start_date") or None,
+            "end_date": record.get("end_date") or None,
+            "assignees": assignees,
+        })
+    return rows
+
+
+def _validate(rows):
+    results = [None] * len(rows)
+    valid = []
+    for index, row in enumerate(rows):
+        if isinstance(row, dict) and "_error" in row:
+            results[index] = {"index": index, "status": "error", "detail": row["_error"]}
+            continue
+        try:
+            valid.append((index, schemas.TaskCreate.model_validate(row)))
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results[index] = {"index": index, "status": "error", "detail": detail}
+    return results, valid
+
+
+def _upsert_statement(db):
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return None
+    stmt = dialect_insert(models.Consultant)
+    # A no-op update rather than DO NOTHING, so RETURNING also yields existing rows
+    return stmt.on_conflict_do_update(
+        index_elements=[models.Consultant.email], set_={"email": stmt.excluded.email}
+    ).returning(models.Consultant.id, models.Consultant.email)
+
+
+def upsert_consultants(db, assignees):
+    """Create consultants missing from ``assignees`` ({email: name}); returns {email: id}."""
+    if not assignees:
+        return {}
+    stmt = _upsert_statement(db)
+    values = [{"email": email, "name": name} for email, name in assignees.items()]
+    if stmt is not None:
+        return {email: id_ for id_, email in db.execute(stmt.values(values))}
+    # Other databases: read existing ids, insert the rest
+    ids = dict(db.execute(
+        select(models.Consultant.email, models.Consultant.id).where(models.Consultant.email.in_(list(assignees)))
+    ).all())
+    missing = [v for v in values if v["email"] not in ids]
+    if missing:
+        db.execute(insert(models.Consultant), missing)
+        ids.update(db.execute(
+            select(models.Consultant.email, models.Consultant.id)
+            .where(models.Consultant.email.in_([v["email"] for v in missing]))
+        ).all())
+    return ids
+
+
+def import_tasks(db, rows):
+    """Validate and insert ``rows``, committing once. Returns the per-row report."""
+    results, valid = _validate(rows)
+    for start in range(0, len(valid), IMPORT_CHUNK_SIZE):
+        chunk = valid[start:start + IMPORT_CHUNK_SIZE]
+        assignees = {}
+        for _, task in chunk:
+            for assignee in task.assignees:
+                assignees.setdefault(assignee.email, assignee.name)
+        consultant_ids = upsert_consultants(db, assignees)
+
+        task_ids = db.execute(
+            insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True),
+            [{
+                "name": task.name,
+                "description": task.description,
+                "start_date": task.start_date,
+                "end_date": task.end_date,
+                "status": models.StatusEnum.NOT_STARTED,
+                "status_pct": 0,
+            } for _, task in chunk]
+        ).scalars().all()
+
+        assignment_rows = []
+        for (index, task), task_id in zip(chunk, task_ids):
+            emails = list(dict.fromkeys(a.email for a in task.assignees))
+            assignment_rows.extend({"task_id": task_id, "consultant_id": consultant_ids[e]} for e in emails)
+            results[index] = {"index": index, "status": "ok", "task_id": task_id, "assignees": len(emails)}
+        if assignment_rows:
+            db.execute(insert(models.assignment_table), assignment_rows)
+        change_feed.record(db, "task", task_ids, "insert")
+    db.commit()
+    if valid:
+        # Core inserts don't pass through the session events that invalidate it
+        dashboard_cache.invalidate()
+    return {"imported": len(valid), "failed": len(rows) - len(valid), "results": results}
@@ -0,0 +1,102 @@
+import json
+from sqlalchemy import select, and_, or_
+from fastapi.responses import StreamingResponse
+from backend.database import AsyncSessionLocal
+
+STREAM_BATCH_SIZE = 500
+
+
+def _created_at_of(model, row_id):
+    # Resolve the cursor row's created_at inside the query so the comparison is
+    # column-to-column and never depends on how the driver formats datetimes.
+    return select(model.created_at).where(model.id == row_id).scalar_subquery()
+
+
+def apply_keyset(query, model, before=None, after=None):
+    """Restrict ``query`` to rows strictly older than ``before`` and/or newer than ``after``.
+
+    Cursors are row ids; ordering is on (created_at, id) so ties on created_at are stable.
+    """
+    if before is not None:
+        c = _created_at_of(model, before)
+        query = query.filter(or_(model.created_at < c, and_(model.created_at == c, model.id < before)))
+    if after is not None:
+        c = _created_at_of(model, after)
+        query = query.filter(or_(model.created_at > c, and_(model.created_at == c, model.id > after)))
+    return query
+
+
+def _page_statement(stmt, model, limit, before=None, after=None):
+    stmt = apply_keyset(stmt, model, before, after)
+    if after is not None and before is None:
+        # Walk forward from the cursor; the rows are flipped to newest-first after fetching.
+        return stmt.order_by(model.created_at.asc(), model.id.asc()).limit(limit), True
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1), False
+
+
+def _finish_page(rows, limit, forward, after):
+    if forward:
+        rows = rows[::-1]
+        older = True
+    else:
+        older = len(rows) > limit
+        rows = rows[:limit]
+    next_cursor = rows[-1].id if rows and older else None
+    prev_cursor = rows[0].id if rows else after
+    return rows, next_cursor, prev_cursor
+
+
+def keyset_page(db, stmt, model, limit, before=None, after=None):
+    """Fetch one page of the ``select()`` statement, newest first.
+
+    Returns (rows, next_cursor, prev_cursor). ``next_cursor`` is passed back as
+    ``before`` for older rows (None when there are none); ``prev_cursor`` is
+    passed back as ``after`` to pick up newer rows.
+    """
+    stmt, forward = _page_statement(stmt, model, limit, before, after)
+    return _finish_page(db.execute(stmt).all(), limit, forward, after)
+
+
+async def keyset_page_async(db, stmt, model, limit, before=None, after=None):
+    """keyset_page on an AsyncSession."""
+    stmt, forward = _page_statement(stmt, model, limit, before, after)
+    rows = (await db.execute(stmt)).all()
+    return _finish_page(rows, limit, forward, after)
+
+
+def set_cursor_headers(response, next_cursor, prev_cursor):
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    if prev_cursor is not None:
+        response.headers["X-Prev-Cursor"] = str(prev_cursor)
+
+
+def _json_default(o):
+    return o.isoformat() if hasattr(o, "isoformat") else str(o)
+
+
+def stream_rows(stmt, model, serialize, fmt, before=None, after=None, batch_size=STREAM_BATCH_SIZE):
+    """Stream every row matching the ``select()`` statement as a JSON array or NDJSON, newest first.
+
+    Rows are pulled in batches of ``batch_size`` on a dedicated AsyncSession, so
+    memory stays flat regardless of how many rows match and the event loop is
+    never blocked on the database.
+    """
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            query = apply_keyset(stmt, model, before, after)
+            query = query.order_by(model.created_at.desc(), model.id.desc())
+            result = await db.stream(query.execution_options(yield_per=batch_size))
+            if fmt == "ndjson":
+                async for row in result:
+                    yield json.dumps(serialize(row), default=_json_default) + "\n"
+                return
+            yield "["
+            sep = ""
+            async for row in result:
+                yield sep + json.dumps(serialize(row), default=_json_default)
+                sep = ","
+            yield "]"
+
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(generate(), media_type=media_type)
@@ -0,0 +1,176 @@
+"""Opt-in SQL profiling to catch N+1 queries and slow statements.
+
+A QueryProfile collects every statement run while it is active and flags:
+
+* more than ``max_statements`` statements in total,
+* the same statement (ignoring parameters and IN-list length) run more than
+  ``max_repeats`` times -- the signature of a lazy load inside a loop,
+* any statement slower than ``slow_ms``.
+
+Three ways to use it:
+
+* ``QUERY_PROFILE=log`` (or ``raise``) adds QueryProfilerMiddleware, which
+  profiles each request, sets an ``X-Query-Count`` response header and logs
+  (or, before the response starts, raises) when a budget is exceeded.
+* ``with QueryProfile() as profile: ...`` then ``profile.check()`` in scripts.
+* The ``query_profile`` fixture in the root conftest.py fails any test that
+  goes over budget.
+"""
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+QUERY_PROFILE = os.getenv("QUERY_PROFILE", "off")  # off | log | raise
+QUERY_PROFILE_MAX_STATEMENTS = int(os.getenv("QUERY_PROFILE_MAX_STATEMENTS", 50))
+QUERY_PROFILE_MAX_REPEATS = int(os.getenv("QUERY_PROFILE_MAX_REPEATS", 5))
+QUERY_PROFILE_SLOW_MS = float(os.getenv("QUERY_PROFILE_SLOW_MS", 200))
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize(statement):
+    """Reduce ``statement`` to its shape so calls differing only in parameters compare equal."""
+    statement = _STRING_RE.sub("'?'", statement)
+    statement = _NUMBER_RE.sub("N", statement)
+    statement = _PLACEHOLDER_LIST_RE.sub("(?...)", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+class QueryProfile:
+    def __init__(self, max_statements=None, max_repeats=None, slow_ms=None):
+        self.max_statements = QUERY_PROFILE_MAX_STATEMENTS if max_statements is None else max_statements
+        self.max_repeats = QUERY_PROFILE_MAX_REPEATS if max_repeats is None else max_repeats
+        self.slow_ms = QUERY_PROFILE_SLOW_MS if slow_ms is None else slow_ms
+        self.statements = []  # (statement, seconds)
+
+    def record(self, statement, elapsed):
+        self.statements.append((statement, elapsed))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self):
+        """Statement shapes run more than ``max_repeats`` times, with their counts."""
+        shapes = Counter(normalize(statement) for statement, _ in self.statements)
+        return {shape: n for shape, n in shapes.most_common() if n > self.max_repeats}
+
+    def slow(self):
+        return [(statement, elapsed) for statement, elapsed in self.statements if elapsed * 1000 > self.slow_ms]
+
+    def problems(self):
+        found = []
+        if self.count > self.max_statements:
+            found.append(f"{self.count} statements (budget {self.max_statements})")
+        for shape, n in self.repeated().items():
+            found.append(f"possible N+1: {n}x {shape[:200]}")
+        for statement, elapsed in self.slow():
+            found.append(f"slow statement ({elapsed * 1000:.0f} ms): {normalize(statement)[:200]}")
+        return found
+
+    def check(self, mode="raise", context=""):
+        """Log or raise (``mode``) if the profile is over any budget."""
+        found = self.problems()
+        if not found:
+            return
+        message = (f"{context}: " if context else "") + "; ".join(found)
+        if mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(f"Query profile {message}")
+
+    def __enter__(self):
+        _install()
+        _global_profiles.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _global_profiles.remove(self)
+        return False
+
+
+# --- statement capture --------------------------------------------------------
+
+_global_profiles = []  # profiles recording statements from every thread
+_request_profile = contextvars.ContextVar("request_query_profile", default=None)
+_installed = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request_profile = _request_profile.get()
+    if not _global_profiles and request_profile is None:
+        return
+    start = getattr(context, "_profile_start", None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    for profile in list(_global_profiles):
+        profile.record(statement, elapsed)
+    if request_profile is not None:
+        request_profile.record(statement, elapsed)
+
+
+def _install(engines=None):
+    if engines is None:
+        from backend.database import engine, get_async_engine
+        engines = [engine]
+        try:
+            engines.append(get_async_engine().sync_engine)
+        except (RuntimeError, ImportError) as e:
+            # No async driver for this database: profile the sync engine alone
+            logger.debug(f"Query profiler not watching the async engine: {e}")
+    for engine in engines:
+        if engine not in _installed:
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            _installed.add(engine)
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware profiling each request; ``mode`` is "log" or "raise"."""
+
+    def __init__(self, app, mode=QUERY_PROFILE):
+        self.app = app
+        self.mode = mode
+        _install()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = QueryProfile()
+        token = _request_profile.set(profile)
+        context = f"{scope['method']} {scope['path']}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Every statement of a non-streaming response has run by now
+                if self.mode == "raise":
+                    profile.check("raise", context)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-query-count", str(profile.count).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_profile.reset(token)
+        if self.mode != "raise":
+            profile.check("log", context)
+
@@ -0,0 +1,82 @@
+"""Email throughput benchmark against the local fake ACS server.
+
+Compares three ways of sending N emails:
+
+* ``per-call``  -- a fresh EmailClient per email, sent serially (the old behaviour)
+* ``pooled``    -- the shared keep-alive client, sent serially via send_email
+* ``batch``     -- the shared client via send_emails (concurrent submit + poll)
+
+    python -m benchmarks.bench_email -n 200 --latency-ms 20
+"""
+import argparse
+import logging
+import time
+
+from azure.communication.email import EmailClient
+from azure.core.credentials import AzureKeyCredential
+
+from backend.services import email_service
+from benchmarks.fake_acs_server import start_fake_acs
+
+
+def _messages(n):
+    return [
+        {"subject": f"Benchmark {i}", "body": "Throughput test", "to_emails": [f"user{i}@example.com"]}
+        for i in range(n)
+    ]
+
+
+def run_per_call(messages):
+    for m in messages:
+        endpoint, access_key = email_service._parse_connection_string(email_service.email_connection_string)
+        client = EmailClient(endpoint, AzureKeyCredential(access_key))
+        client.begin_send(
+            email_service.build_message(m["subject"], m["body"], m["to_emails"]),
+            polling_interval=email_service.EMAIL_POLLING_INTERVAL
+        ).result()
+
+
+def run_pooled(messages):
+    for m in messages:
+        email_service.send_email(m["subject"], m["body"], m["to_emails"])
+
+
+def run_batch(messages):
+    errors = [r for r in email_service.send_emails(messages) if isinstance(r, Exception)]
+    if errors:
+        raise errors[0]
+
+
+MODES = {"per-call": run_per_call, "pooled": run_pooled, "batch": run_batch}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outbound email throughput")
+    parser.add_argument("-n", type=int, default=100, help="emails per mode")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="simulated ACS latency per request")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="LRO polling interval in seconds")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    logging.getLogger("backend.services.email_service").setLevel(logging.WARNING)
+    logging.getLogger("azure").setLevel(logging.WARNING)
+
+    server = start_fake_acs(latency=args.latency_ms / 1000)
+    email_service.email_connection_string = server.connection_string
+    email_service.sender_address = "bench@example.com"
+    email_service.EMAIL_POLLING_INTERVAL = args.poll_interval
+
+    messages = _messages(args.n)
+    print(f"{'mode':<10} {'emails':>7} {'seconds':>9} {'msgs/sec':>10} {'connections':>12}")
+    for mode in args.modes:
+        email_service.reset_email_client()
+        conns_before = server.connections
+        start = time.perf_counter()
+        MODES[mode](messages)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<10} {args.n:>7} {elapsed:>9.2f} {args.n / elapsed:>10.1f} {server.connections - conns_before:>12}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
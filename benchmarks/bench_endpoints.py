@@ -0,0 +1,231 @@
+"""Endpoint benchmark suite: p50/p95 latency and peak memory per hot path.
+
+Drives the real app through FastAPI's TestClient against a database filled by
+benchmarks.generate_data (a fresh one at --scale unless --database is given):
+
+* GET /tasks/, /updates/, /leave-updates/ and /summary/dashboard
+* POST /tasks/process-reply
+* weekly_performance_job (called directly; its outbox emails are not sent)
+
+Each case is timed over --iterations calls after a warmup, then run a few
+more times under tracemalloc for its peak Python allocation. Results are
+written as JSON keyed by the current commit so runs can be compared:
+
+    python -m benchmarks.bench_endpoints --scale medium
+    python -m benchmarks.bench_endpoints --compare benchmarks/results/<old-commit>.json
+
+With --compare the run exits non-zero if any p95 regressed past --threshold.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# The app binds its engines at import time, so choose the database first
+_pre = argparse.ArgumentParser(add_help=False)
+_pre.add_argument("--database")
+_database = _pre.parse_known_args()[0].database
+if _database:
+    DATABASE_URL = _database if "://" in _database else f"sqlite:///{_database}"
+else:
+    DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_endpoints_'), 'bench.db')}"
+os.environ["DATABASE_URL"] = DATABASE_URL
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import SessionLocal, init_db  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.services import dashboard_cache, outbox  # noqa: E402
+from backend.services.scheduler import weekly_performance_job  # noqa: E402
+from benchmarks.generate_data import SCALES, generate  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+MEMORY_ITERATIONS = 3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="Existing database from benchmarks.generate_data (default: generate one)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Size of the generated database when --database is not given")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--weekly-iterations", type=int, default=5,
+                        help="weekly_performance_job is much heavier than a request")
+    parser.add_argument("--only", action="append", help="Run only the named case (repeatable)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="p95 ratio over the baseline that counts as a regression")
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_cases(client):
+    session = SessionLocal()
+    try:
+        n_tasks = session.query(models.Task).count()
+        n_consultants = session.query(models.Consultant).count()
+    finally:
+        session.close()
+    rng = random.Random(0)
+
+    def get(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code, response.text[:200])
+        return call
+
+    def dashboard():
+        # Measure the query, not the cache hit
+        dashboard_cache.invalidate()
+        get("/summary/dashboard")()
+
+    def process_reply():
+        response = client.post("/tasks/process-reply", json={
+            "task_id": rng.randint(1, n_tasks),
+            "consultant_email": f"consultant{rng.randint(1, n_consultants)}@example.com",
+            "email_subject": "Re: status",
+            "email_body": f"Hi, I'm about {rng.randint(1, 99)}% done. Should be finished by Friday.",
+        })
+        assert response.status_code == 200, response.text[:200]
+
+    def weekly_job():
+        weekly_performance_job()
+
+    def reset_weekly():
+        # Each run must do the full week's work, not resume a finished one
+        session = SessionLocal()
+        try:
+            session.query(models.OutboxEmail).delete(synchronize_session=False)
+            session.query(models.PerformanceReport).delete(synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    # Emails queued by the weekly job stay in the outbox instead of being sent
+    outbox.kick = lambda: None
+
+    return {
+        "GET /tasks/": (get("/tasks/?limit=100"), None),
+        "GET /tasks/?status": (get("/tasks/?status=Blocked&limit=100"), None),
+        "GET /updates/": (get("/updates/?limit=100"), None),
+        "GET /leave-updates/": (get("/leave-updates/?limit=100"), None),
+        "GET /summary/dashboard": (dashboard, None),
+        "POST /tasks/process-reply": (process_reply, None),
+        "weekly_performance_job": (weekly_job, reset_weekly),
+    }
+
+
+def run_case(call, reset, iterations):
+    for _ in range(2):  # warm caches and connections
+        if reset:
+            reset()
+        call()
+    timings = []
+    for _ in range(iterations):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    peak = 0
+    for _ in range(MEMORY_ITERATIONS):
+        if reset:
+            reset()
+        tracemalloc.start()
+        try:
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        "max_ms": round(timings[-1], 3),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline.get('commit')} ({baseline_path})")
+    print(f"{'case':<28}{'p95 before':>12}{'p95 now':>12}{'ratio':>8}{'mem ratio':>11}")
+    regressions = []
+    for name, now in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = now["p95_ms"] / before["p95_ms"] if before["p95_ms"] else float("inf")
+        mem_ratio = now["peak_mem_kb"] / before["peak_mem_kb"] if before["peak_mem_kb"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<28}{before['p95_ms']:>12.1f}{now['p95_ms']:>12.1f}{ratio:>8.2f}{mem_ratio:>11.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    generated_counts = None
+    if not args.database:
+        print(f"Generating {args.scale} dataset at {DATABASE_URL}")
+        generated_counts = generate(DATABASE_URL, **SCALES[args.scale])
+
+    init_db()
+    # No lifespan: the scheduler must not start polling IMAP or sending mail
+    client = TestClient(app)
+    cases = build_cases(client)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name in args.only}
+
+    results = {}
+    print(f"{'case':<28}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'peak KB':>12}")
+    for name, (call, reset) in cases.items():
+        iterations = args.weekly_iterations if reset else args.iterations
+        results[name] = run_case(call, reset, iterations)
+        r = results[name]
+        print(f"{name:<28}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['max_ms']:>10.1f}{r['peak_mem_kb']:>12.1f}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": DATABASE_URL,
+        "dataset": generated_counts or args.database,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nProcess max RSS {report['max_rss_kb'] / 1024:.0f} MB; results saved to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Reply-extraction throughput benchmark on a synthetic corpus.
+
+Compares the keyword-gated engine (backend.services.extraction.extract_reply)
+with the previous multi-regex path, where process-reply ran each extractor and
+then summarize_reply ran them again, and the IMAP parser ran its own regex set.
+Both paths are checked for identical output before timing.
+
+    python -m benchmarks.bench_extraction -n 20000
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.services.extraction import extract_reply, determine_status_label
+from backend.services.parser import parse_status_from_text
+
+
+# --- previous implementation, kept here as the baseline -------------------
+
+def legacy_classify_intent(body):
+    body_lower = body.lower()
+    if any(word in body_lower for word in ["ooo", "vacation", "sick", "leave"]):
+        return "leave"
+    if any(word in body_lower for word in ["progress", "complete", "blocked", "eta", "%", "update"]):
+        return "update"
+    return "other"
+
+def legacy_extract_percent_complete(body):
+    match = re.search(r"(\d{1,3})\s*%[\s\w]*complete", body, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    match = re.search(r"(\d{1,3})\s*%", body)
+    if match:
+        return int(match.group(1))
+    return None
+
+def legacy_extract_eta(body):
+    match = re.search(r"eta[:\s\-]*([0-9]{4}-[0-9]{2}-[0-9]{2})", body, re.IGNORECASE)
+    return match.group(1) if match else None
+
+def legacy_extract_blockers(body):
+    match = re.search(r"blocked by ([^\.\n]+)", body, re.IGNORECASE)
+    return match.group(1).strip() if match else None
+
+def legacy_extract_absence(body):
+    match = re.search(r"on leave from ([0-9\-]+) to ([0-9\-]+)(?: due to ([\w\s]+))?", body, re.IGNORECASE)
+    if match:
+        start, end, reason = match.groups()
+        return f"On leave {start} to {end}" + (f" ({reason.strip()})" if reason else "")
+    return None
+
+def legacy_summarize_reply(body):
+    percent = legacy_extract_percent_complete(body)
+    blockers = legacy_extract_blockers(body)
+    eta = legacy_extract_eta(body)
+    absence = legacy_extract_absence(body)
+    parts = []
+    if percent is not None:
+        parts.append(f"{percent}% complete")
+    if blockers:
+        parts.append(f"Blocked by {blockers}")
+    if eta:
+        parts.append(f"ETA: {eta}")
+    if absence:
+        parts.append(absence)
+    return ". ".join(parts) + ("." if parts else "")
+
+LEGACY_FORM = {
+    "status_label": re.compile(r"Status:\s*(Not Started|In Progress|Blocked|Done)", re.IGNORECASE),
+    "status_pct": re.compile(r"Percent(?:\s|\-|_)?complete:\s*(\d{1,3})", re.IGNORECASE),
+    "blockers": re.compile(r"Blockers?:\s*(.+)", re.IGNORECASE),
+    "eta_date": re.compile(r"ETA:\s*([\w\-\/\,\s]+)", re.IGNORECASE),
+    "task_name": re.compile(r"Task:\s*(.+)", re.IGNORECASE),
+}
+
+def legacy_form(body):
+    out = {}
+    for key, pattern in LEGACY_FORM.items():
+        m = pattern.search(body)
+        if not m:
+            out[key] = None
+        elif key == "status_label":
+            out[key] = m.group(1).title()
+        elif key == "status_pct":
+            out[key] = max(0, min(100, int(m.group(1))))
+        else:
+            out[key] = m.group(1).strip()
+    return out
+
+def legacy_extract(body):
+    intent = legacy_classify_intent(body)
+    percent = legacy_extract_percent_complete(body)
+    blockers = legacy_extract_blockers(body)
+    return {
+        "intent": intent,
+        "percent_complete": percent,
+        "eta_date": legacy_extract_eta(body),
+        "blockers": blockers,
+        "absence": legacy_extract_absence(body),
+        "summary": legacy_summarize_reply(body),
+        "status_label": determine_status_label(intent, percent, blockers),
+        "form": legacy_form(body),
+    }
+
+
+# --- synthetic corpus ------------------------------------------------------
+
+FRAGMENTS = [
+    "Hi team,", "Quick update on the migration.", "We are at {pct}% complete.",
+    "Progress is about {pct}%.", "Currently blocked by {blocker}.", "ETA: {date}",
+    "eta - {date}", "I will be on leave from {date} to {date2} due to family event",
+    "I'm OOO tomorrow.", "Feeling sick today, will update later.",
+    "Status: {status}", "Percent complete: {pct}", "Blockers: {blocker}",
+    "Task: {task}", "Notes: reviewed the metadata changes.", "Thanks,", "Regards, {name}",
+    "Nothing much to report.", "Let me know if you have questions.",
+]
+BLOCKERS = ["the API team", "missing credentials", "infra approval", "a flaky test suite"]
+STATUSES = ["Not Started", "In Progress", "Blocked", "Done", "in progress"]
+TASKS = ["Data migration", "Login page", "Quarterly report", "Billing sync"]
+NAMES = ["Asha", "Ravi", "Meena", "John"]
+
+
+def make_corpus(n, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        lines = []
+        for frag in rng.sample(FRAGMENTS, rng.randint(2, 8)):
+            lines.append(frag.format(
+                pct=rng.randint(0, 100),
+                blocker=rng.choice(BLOCKERS),
+                date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                date2=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                status=rng.choice(STATUSES),
+                task=rng.choice(TASKS),
+                name=rng.choice(NAMES),
+            ))
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def _bench(label, fn, corpus):
+    start = time.perf_counter()
+    for body in corpus:
+        fn(body)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(corpus) / elapsed:>12,.0f} msgs/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reply extraction")
+    parser.add_argument("-n", type=int, default=20000, help="messages in the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n, args.seed)
+    mismatches = sum(1 for body in corpus if extract_reply(body) != legacy_extract(body))
+    if mismatches:
+        raise SystemExit(f"{mismatches} messages extracted differently from the legacy path")
+    print(f"corpus: {args.n} messages, outputs identical to legacy path")
+
+    legacy = _bench("legacy (all fields)", legacy_extract, corpus)
+    engine = _bench("extract_reply", extract_reply, corpus)
+    _bench("parse_status_from_text", parse_status_from_text, corpus)
+    print(f"speedup: {legacy / engine:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
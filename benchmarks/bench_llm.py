@@ -0,0 +1,75 @@
+"""Draft-reply latency and cache benchmark using the offline stub LLM backend.
+
+Fires concurrent /tasks/draft-reply-style completions where a share of the
+prompts repeat, and reports latency percentiles, upstream calls and cache hit
+rate.
+
+    python -m benchmarks.bench_llm -n 500 --repeat 0.6 --concurrency 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from backend.services import llm_service
+
+
+async def _one(prompt, latencies):
+    start = time.perf_counter()
+    await llm_service.complete_chat([
+        {"role": "system", "content": "You are a helpful project manager assistant."},
+        {"role": "user", "content": prompt},
+    ])
+    latencies.append(time.perf_counter() - start)
+
+
+async def run(n, repeat, concurrency, seed):
+    rng = random.Random(seed)
+    seen = []
+    prompts = []
+    for i in range(n):
+        if seen and rng.random() < repeat:
+            prompts.append(rng.choice(seen))
+        else:
+            prompt = f"Assignee replied: task {i} is {rng.randint(0, 100)}% complete."
+            seen.append(prompt)
+            prompts.append(prompt)
+
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def bounded(prompt):
+        async with gate:
+            await _one(prompt, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(p) for p in prompts))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark draft-reply LLM calls against the stub backend")
+    parser.add_argument("-n", type=int, default=500, help="number of draft requests")
+    parser.add_argument("--repeat", type=float, default=0.5, help="share of requests repeating an earlier prompt")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent client requests")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub upstream latency in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    stub = llm_service.StubChatBackend(latency=args.latency)
+    llm_service.set_backend(stub)
+    elapsed, latencies = asyncio.run(run(args.n, args.repeat, args.concurrency, args.seed))
+
+    latencies.sort()
+    stats = llm_service.cache_stats()
+    print(f"requests        {args.n}")
+    print(f"wall time       {elapsed:.2f}s ({args.n / elapsed:.1f} req/s)")
+    print(f"p50 latency     {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"p95 latency     {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"upstream calls  {stub.calls} (max concurrency {llm_service.LLM_MAX_CONCURRENCY})")
+    print(f"cache hit rate  {stats['hit_rate']:.1%} ({stats['hits']} hits / {stats['misses']} misses)")
+
+
+if __name__ == "__main__":
+    main()
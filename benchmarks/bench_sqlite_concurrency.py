@@ -0,0 +1,156 @@
+"""Concurrent read/write benchmark for the SQLite connection profiles.
+
+Writer threads behave like the scheduler jobs: each transaction inserts a
+batch of status updates, does some work while holding the write lock, then
+commits. Reader threads meanwhile page /updates through the same keyset query
+the router uses, and exporter threads stream the whole table the way
+``/updates?stream=json`` does. Each profile from
+backend.database.build_engine gets a fresh database file.
+
+    python -m benchmarks.bench_sqlite_concurrency --seconds 10 --readers 8 --writers 2 --exporters 1
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend import models
+from backend.database import Base, build_engine
+from backend.routers.Updates import build_updates_query
+from backend.utils.pagination import keyset_page
+
+
+def seed(Session, consultants=50, updates=20000):
+    db = Session()
+    people = [models.Consultant(name=f"Consultant {i}", email=f"c{i}@example.com") for i in range(consultants)]
+    db.add_all(people)
+    db.flush()
+    db.execute(models.StatusUpdate.__table__.insert(), [
+        {"consultant_id": people[i % consultants].id, "intent": "update", "status_pct": i % 100, "reply_sent": 0}
+        for i in range(updates)
+    ])
+    db.commit()
+    db.close()
+
+
+def run_profile(profile, seconds, readers, writers, exporters, batch, hold_ms):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_sqlite_"), "bench.db")
+    engine = build_engine(f"sqlite:///{path}", profile)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    Base.metadata.create_all(bind=engine)
+    seed(Session)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_latencies, write_latencies = [], []
+    errors = {"read": 0, "write": 0}
+    exports = [0]
+
+    def reader():
+        db = Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                keyset_page(db, build_updates_query(), models.StatusUpdate, 100)
+                db.rollback()  # end the read transaction like a request would
+                elapsed = time.perf_counter() - start
+                with lock:
+                    read_latencies.append(elapsed)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors["read"] += 1
+        db.close()
+
+    def exporter():
+        db = Session()
+        while not stop.is_set():
+            try:
+                stmt = build_updates_query().order_by(models.StatusUpdate.created_at.desc())
+                for _ in db.execute(stmt.execution_options(yield_per=500)):
+                    pass
+                db.rollback()
+                with lock:
+                    exports[0] += 1
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors["read"] += 1
+        db.close()
+
+    def writer(worker):
+        db = Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                db.add_all([
+                    models.StatusUpdate(consultant_id=1 + (worker + i) % 50, intent="leave", reply_sent=0)
+                    for i in range(batch)
+                ])
+                db.flush()
+                time.sleep(hold_ms / 1000)  # report building while the write lock is held
+                db.commit()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    write_latencies.append(elapsed)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors["write"] += 1
+        db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=exporter) for _ in range(exporters)]
+    threads += [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    def pct(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else float("nan")
+
+    return {
+        "reads/s": len(read_latencies) / seconds,
+        "read p50 ms": pct(read_latencies, 50),
+        "read p99 ms": pct(read_latencies, 99),
+        "exports/s": exports[0] / seconds,
+        "writes/s": len(write_latencies) / seconds,
+        "write p99 ms": pct(write_latencies, 99),
+        "read errors": errors["read"],
+        "write errors": errors["write"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite connection profiles under concurrent load")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--exporters", type=int, default=1, help="threads streaming the full updates feed")
+    parser.add_argument("--batch", type=int, default=50, help="rows per write transaction")
+    parser.add_argument("--hold-ms", type=float, default=20, help="time each write transaction holds the lock")
+    args = parser.parse_args()
+
+    results = {}
+    for profile in ("basic", "production"):
+        print(f"running {profile} profile for {args.seconds:g}s ...")
+        results[profile] = run_profile(
+            profile, args.seconds, args.readers, args.writers, args.exporters, args.batch, args.hold_ms
+        )
+
+    print(f"\n{'':<14}{'basic':>12}{'production':>12}")
+    for metric in results["basic"]:
+        print(f"{metric:<14}{results['basic'][metric]:>12,.1f}{results['production'][metric]:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
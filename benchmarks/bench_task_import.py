@@ -0,0 +1,107 @@
+"""Task import throughput: POST /tasks/import against N calls to POST /tasks/.
+
+Both paths run through FastAPI's TestClient on the same scratch SQLite
+database, with the same synthetic tasks (a few assignees each, drawn from a
+pool of consultants so most rows reuse existing ones). Both sides' task and
+assignment counts are checked before timings are reported.
+
+    python -m benchmarks.bench_task_import -n 2000 --consultants 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# The app binds its engines at import time, so point it at a scratch database first
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_import_'), 'bench.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import SessionLocal, init_db  # noqa: E402
+from backend.main import app  # noqa: E402
+
+
+def make_tasks(n, consultants, seed):
+    rng = random.Random(seed)
+    pool = [{"name": f"Consultant {i}", "email": f"consultant{i}@example.com"} for i in range(consultants)]
+    return [
+        {
+            "name": f"Task {i}",
+            "description": "Imported by the benchmark",
+            "start_date": "2025-01-06T09:00:00",
+            "end_date": f"2025-{rng.randint(2, 12):02d}-{rng.randint(1, 28):02d}T17:00:00",
+            "assignees": rng.sample(pool, rng.randint(1, 3)),
+        }
+        for i in range(n)
+    ]
+
+
+def _reset():
+    session = SessionLocal()
+    try:
+        session.execute(models.assignment_table.delete())
+        session.query(models.Task).delete(synchronize_session=False)
+        session.query(models.Consultant).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _counts():
+    session = SessionLocal()
+    try:
+        return (
+            session.query(models.Task).count(),
+            session.query(models.Consultant).count(),
+            session.query(models.assignment_table).count(),
+        )
+    finally:
+        session.close()
+
+
+def run_per_task(client, tasks):
+    for task in tasks:
+        client.post("/tasks/", json=task).raise_for_status()
+
+
+def run_import(client, tasks):
+    response = client.post("/tasks/import", json=tasks)
+    response.raise_for_status()
+    if response.json()["failed"]:
+        raise SystemExit(f"bulk import rejected rows: {response.json()['results'][:3]}")
+
+
+def _bench(label, fn, client, tasks):
+    _reset()
+    start = time.perf_counter()
+    fn(client, tasks)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {len(tasks) / elapsed:>12,.0f} tasks/sec  ({elapsed:.2f}s)")
+    return elapsed, _counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk task import")
+    parser.add_argument("-n", type=int, default=2000, help="tasks to create")
+    parser.add_argument("--consultants", type=int, default=200, help="size of the assignee pool")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    init_db()
+    client = TestClient(app)
+    tasks = make_tasks(args.n, args.consultants, args.seed)
+    print(f"{args.n} tasks, {args.consultants} consultants")
+
+    per_task, per_task_counts = _bench("POST /tasks/ x N", run_per_task, client, tasks)
+    bulk, bulk_counts = _bench("POST /tasks/import", run_import, client, tasks)
+    if per_task_counts != bulk_counts:
+        raise SystemExit(f"row counts differ (tasks, consultants, assignments): {per_task_counts} vs {bulk_counts}")
+    print(f"rows (tasks, consultants, assignments): {bulk_counts}")
+    print(f"speedup: {per_task / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
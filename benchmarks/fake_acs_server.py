@@ -0,0 +1,126 @@
+"""Local stand-in for the Azure Communication Services Email REST API.
+
+Implements just enough of ``POST /emails:send`` and the operation-status
+endpoint for ``azure-communication-email`` to complete a send, so email
+throughput can be measured offline:
+
+    python -m benchmarks.fake_acs_server --port 8765 --latency-ms 50
+
+then point ACS_EMAIL_CONNECTION_STRING at the printed connection string.
+"""
+import argparse
+import base64
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeACSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, polls_until_done=1):
+        super().__init__(address, FakeACSHandler)
+        self.latency = latency
+        self.polls_until_done = polls_until_done
+        self.operations = {}
+        self.connections = 0
+        self.sends = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def connection_string(self):
+        host, port = self.server_address[:2]
+        key = base64.b64encode(b"fake-acs-key").decode()
+        return f"endpoint=http://{host}:{port}/;accesskey={key}"
+
+    def new_operation(self):
+        with self._lock:
+            op_id = f"op-{next(self._ids)}"
+            self.operations[op_id] = 0
+            self.sends += 1
+        return op_id
+
+    def poll_operation(self, op_id):
+        with self._lock:
+            if op_id not in self.operations:
+                return None
+            self.operations[op_id] += 1
+            return "Succeeded" if self.operations[op_id] >= self.polls_until_done else "Running"
+
+
+class FakeACSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True  # avoid delayed-ACK stalls on reused connections
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        path, _, query = self.path.partition("?")
+        if path != "/emails:send":
+            return self._reply(404, {"error": {"code": "NotFound", "message": path}})
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        op_id = self.server.new_operation()
+        host = self.headers.get("Host")
+        location = f"http://{host}/emails/operations/{op_id}?{query}"
+        self._reply(202, {"id": op_id, "status": "Running"}, {"Operation-Location": location})
+
+    def do_GET(self):
+        path = self.path.partition("?")[0]
+        prefix = "/emails/operations/"
+        if not path.startswith(prefix):
+            return self._reply(404, {"error": {"code": "NotFound", "message": path}})
+        op_id = path[len(prefix):]
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status = self.server.poll_operation(op_id)
+        if status is None:
+            return self._reply(404, {"error": {"code": "NotFound", "message": op_id}})
+        self._reply(200, {"id": op_id, "status": status})
+
+
+def start_fake_acs(host="127.0.0.1", port=0, latency=0.0, polls_until_done=1):
+    """Start the fake server on a background thread and return it."""
+    server = FakeACSServer((host, port), latency=latency, polls_until_done=polls_until_done)
+    threading.Thread(target=server.serve_forever, name="fake-acs", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every request")
+    parser.add_argument("--polls", type=int, default=1, help="status polls before an operation succeeds")
+    args = parser.parse_args()
+    server = FakeACSServer((args.host, args.port), latency=args.latency_ms / 1000, polls_until_done=args.polls)
+    print(f"Fake ACS listening; ACS_EMAIL_CONNECTION_STRING={server.connection_string}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
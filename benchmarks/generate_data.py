@@ -0,0 +1,190 @@
+"""Synthetic data generator for the ai_pm schema.
+
+Fills a database built by the app's own models and migrations with
+consultants, tasks and their assignments, inbound emails and the status
+updates parsed from them, at whatever scale the run needs. Rows are generated
+from a fixed seed, so the same arguments always produce the same database, and
+inserted in chunks of executemany through Core.
+
+    python -m benchmarks.generate_data /tmp/bench.db --scale large
+    python -m benchmarks.generate_data /tmp/bench.db --consultants 500 --tasks 5000 --updates 200000
+
+Never point it at the live ai_pm.db: it expects an empty database.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, select
+
+from backend import models
+from backend.database import Base, build_engine
+from backend.migrations import run_migrations
+
+SCALES = {
+    "small": {"consultants": 200, "tasks": 2_000, "updates": 50_000, "emails": 50_000},
+    "medium": {"consultants": 2_000, "tasks": 20_000, "updates": 500_000, "emails": 500_000},
+    "large": {"consultants": 10_000, "tasks": 100_000, "updates": 5_000_000, "emails": 5_000_000},
+}
+
+CHUNK_SIZE = 10_000
+
+# Share of tasks per status, roughly what a year of use looks like
+STATUS_WEIGHTS = (
+    (models.StatusEnum.DONE, 60),
+    (models.StatusEnum.IN_PROGRESS, 25),
+    (models.StatusEnum.NOT_STARTED, 10),
+    (models.StatusEnum.BLOCKED, 5),
+)
+
+# (intent, body, status_label, blockers) as extract_reply produces them
+REPLY_BODIES = (
+    ("update", "Hi, I'm about {pct}% done with this. Should be finished by Friday.", "In Progress", None),
+    ("update", "Completed the task, 100% done.", "Completed", None),
+    ("update", "About {pct}% done, blocked by access to the staging server.", "In Progress",
+     "access to the staging server"),
+    ("leave", "I'll be on leave tomorrow, will resume on Monday.", "On Leave", None),
+    ("other", "Thanks, noted.", "Unknown", None),
+)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(conn, table, rows):
+    n = 0
+    for chunk in _chunks(rows):
+        conn.execute(insert(table), chunk)
+        n += len(chunk)
+    return n
+
+
+def _consultants(n):
+    for i in range(n):
+        yield {"id": i + 1, "name": f"Consultant {i + 1}", "email": f"consultant{i + 1}@example.com"}
+
+
+def _tasks(rng, n, now):
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    for i in range(n):
+        start = now - timedelta(days=rng.randint(0, 365))
+        status = rng.choices(statuses, weights)[0]
+        yield {
+            "id": i + 1,
+            "name": f"Task {i + 1}",
+            "description": f"Synthetic task {i + 1}",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(1, 120)),
+            "status": status,
+            "status_pct": 100 if status == models.StatusEnum.DONE else rng.randint(0, 95),
+            "last_updated_at": now - timedelta(hours=rng.randint(0, 24 * 90)),
+        }
+
+
+def _assignments(rng, tasks, consultants):
+    for task_id in range(1, tasks + 1):
+        for consultant_id in rng.sample(range(1, consultants + 1), k=min(consultants, rng.randint(1, 3))):
+            yield {"task_id": task_id, "consultant_id": consultant_id}
+
+
+def _emails(rng, n, tasks, consultants, now):
+    for i in range(n):
+        consultant_id = rng.randint(1, consultants)
+        _, template, _, _ = rng.choice(REPLY_BODIES)
+        yield {
+            "id": i + 1,
+            "external_message_id": f"<synthetic-{i + 1}@example.com>",
+            "direction": "inbound",
+            "subject": f"Re: Task {rng.randint(1, tasks)}",
+            "body_text": template.format(pct=rng.randint(0, 100)),
+            "sender": f"consultant{consultant_id}@example.com",
+            "sent_at": now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+            "thread_id": f"thread-{i // 4}",
+            "linked_task_id": rng.randint(1, tasks),
+            "linked_consultant_id": consultant_id,
+        }
+
+
+def _updates(rng, n, tasks, consultants, emails, now):
+    for i in range(n):
+        intent, template, label, blockers = rng.choice(REPLY_BODIES)
+        pct = rng.randint(0, 100)
+        yield {
+            "task_id": rng.randint(1, tasks),
+            "consultant_id": rng.randint(1, consultants),
+            "intent": intent,
+            "status_pct": pct if intent == "update" else None,
+            "status_label": label,
+            "blockers": blockers,
+            "summary": template.format(pct=pct),
+            "source_email_id": rng.randint(1, emails) if emails else None,
+            "created_at": now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+            "reply_sent": rng.randint(0, 1) if intent == "leave" else 0,
+        }
+
+
+def generate(url, consultants, tasks, updates, emails, seed=0, log=print):
+    """Create the schema at ``url`` and fill it. Returns the row count per table."""
+    engine = build_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _bulk_load_pragmas(dbapi_connection, connection_record):
+        # Disposable benchmark data: don't pay for durability while loading
+        if engine.dialect.name == "sqlite":
+            dbapi_connection.execute("PRAGMA synchronous=OFF")
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(models.Task)).scalar():
+            raise SystemExit(f"{url} already has tasks; generate into an empty database")
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    steps = (
+        ("consultants", models.Consultant.__table__, lambda: _consultants(consultants)),
+        ("tasks", models.Task.__table__, lambda: _tasks(rng, tasks, now)),
+        ("assignments", models.assignment_table, lambda: _assignments(rng, tasks, consultants)),
+        ("email_messages", models.EmailMessage.__table__, lambda: _emails(rng, emails, tasks, consultants, now)),
+        ("status_updates", models.StatusUpdate.__table__,
+         lambda: _updates(rng, updates, tasks, consultants, emails, now)),
+    )
+    counts = {}
+    for name, table, rows in steps:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            counts[name] = _insert(conn, table, rows())
+        log(f"{name:<16}{counts[name]:>12,} rows in {time.perf_counter() - start:.1f}s")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", help="SQLite file to create, or a full SQLAlchemy URL")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for table in ("consultants", "tasks", "updates", "emails"):
+        parser.add_argument(f"--{table}", type=int, help=f"Override the number of {table} for --scale")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    sizes.update({k: v for k, v in vars(args).items() if k in sizes and v is not None})
+    url = args.database if "://" in args.database else f"sqlite:///{args.database}"
+    generate(url, seed=args.seed, **sizes)
+
+
+if __name__ == "__main__":
+    main()
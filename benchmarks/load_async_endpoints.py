@@ -0,0 +1,157 @@
+"""Tail-latency load test for the read routers, before and after AsyncSession.
+
+Serves two versions of GET /updates/ from one uvicorn process on a seeded
+scratch database:
+
+* /legacy/updates/ -- the previous handler: ``async def`` running the
+  synchronous Session on the event loop
+* /updates/        -- the current router on AsyncSession
+
+Concurrent clients hit one version at a time, while a probe requests a
+trivial endpoint (GET /) to show how long unrelated requests wait behind the
+database work.
+
+    python -m benchmarks.load_async_endpoints --rows 50000 --concurrency 16 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="load_async_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'load.db')}"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, FastAPI, Query  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.routers import Updates  # noqa: E402
+from backend.routers.Updates import build_updates_query, update_to_dict  # noqa: E402
+from backend.utils.pagination import keyset_page  # noqa: E402
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def build_app():
+    app = FastAPI()
+    app.include_router(Updates.router)
+
+    @app.get("/legacy/updates/")
+    async def legacy_updates(db=Depends(get_db), limit: int = Query(100)):
+        updates, _, _ = keyset_page(db, build_updates_query(), models.StatusUpdate, limit)
+        return [update_to_dict(update) for update in updates]
+
+    @app.get("/")
+    def root():
+        return {"ok": True}
+
+    return app
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    people = [models.Consultant(name=f"Consultant {i}", email=f"c{i}@example.com") for i in range(100)]
+    db.add_all(people)
+    db.flush()
+    db.execute(models.StatusUpdate.__table__.insert(), [
+        {"consultant_id": people[i % 100].id, "intent": "update", "status_pct": i % 100,
+         "summary": f"{i % 100}% complete.", "reply_sent": 0}
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app):
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def _pct(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else float("nan")
+
+
+async def run_load(base_url, path, limit, concurrency, seconds):
+    latencies, probe = [], []
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Open every connection and warm the pool before timing
+        await asyncio.gather(*(client.get(path, params={"limit": limit}) for _ in range(concurrency + 1)))
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                r = await client.get(path, params={"limit": limit})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def prober():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                (await client.get("/")).raise_for_status()
+                probe.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(prober(), *(worker() for _ in range(concurrency)))
+    return {
+        "req/s": len(latencies) / seconds,
+        "p50 ms": _pct(latencies, 50),
+        "p99 ms": _pct(latencies, 99),
+        "probe p50 ms": _pct(probe, 50),
+        "probe p99 ms": _pct(probe, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /updates with the sync and AsyncSession handlers")
+    parser.add_argument("--rows", type=int, default=50000, help="status updates to seed")
+    parser.add_argument("--limit", type=int, default=500, help="page size per request")
+    # Keep below DB_POOL_SIZE + DB_MAX_OVERFLOW: the legacy handler waits for a
+    # pooled connection on the event loop, which deadlocks once the pool is empty
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    server, thread, base_url = start_server(build_app())
+    try:
+        results = {}
+        for label, path in (("sync session", "/legacy/updates/"), ("AsyncSession", "/updates/")):
+            print(f"loading {path} for {args.seconds:g}s ...")
+            results[label] = asyncio.run(run_load(base_url, path, args.limit, args.concurrency, args.seconds))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print(f"\n{'':<14}{'sync session':>14}{'AsyncSession':>14}")
+    for metric in results["sync session"]:
+        print(f"{metric:<14}{results['sync session'][metric]:>14,.1f}{results['AsyncSession'][metric]:>14,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""EXPLAIN QUERY PLAN regression check for the hot read paths.
+
+Runs each hot query through the same code the routers use against a scratch
+SQLite database built by init_db (models + migrations): the async keyset pages
+and streams behind /updates/ and /leave-updates/, the /tasks/ filters and the
+send-mail lookups. Every SQL statement they issue, on the sync or the async
+engine, is captured and SQLite asked for its plan. Exits non-zero if any plan
+falls back to a full table scan ("SCAN <table>" with no index).
+
+    python -m benchmarks.query_plans [-v]
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+_db_dir = tempfile.mkdtemp(prefix="query_plans_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'plans.db')}"
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import AsyncSessionLocal, SessionLocal, engine, get_async_engine, init_db  # noqa: E402
+from backend.routers.dashboard import get_dashboard_summary  # noqa: E402
+from backend.routers.tasks import list_tasks  # noqa: E402
+from backend.routers.Updates import build_updates_query, update_to_dict  # noqa: E402
+from backend.routers.leave_updates import build_leave_updates_query, leave_update_to_dict  # noqa: E402
+from backend.routers.reply import latest_leave_update  # noqa: E402
+from backend.utils.pagination import keyset_page_async, stream_rows  # noqa: E402
+
+# "SCAN tasks" (3.36+) or "SCAN TABLE tasks" (older); index scans say "USING ... INDEX"
+FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+@contextmanager
+def capture_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engines = (engine, get_async_engine().sync_engine)
+    for e in engines:
+        event.listen(e, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(statement, parameters):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def seed(db):
+    consultant = models.Consultant(name="Plan Check", email="plans@example.com")
+    # overdue, so the dashboard also runs its assignee selectinload
+    task = models.Task(name="Plan check task", end_date=datetime(2000, 1, 1), consultants=[consultant])
+    db.add_all([consultant, task])
+    db.flush()
+    db.add_all([
+        models.StatusUpdate(task_id=task.id, consultant_id=consultant.id, intent="update", status_pct=50),
+        models.StatusUpdate(task_id=task.id, consultant_id=consultant.id, intent="leave", reply_sent=0),
+    ])
+    db.commit()
+    return task.id, consultant.id, consultant.email
+
+
+def run_async(coroutine_fn):
+    """Sync wrapper running ``coroutine_fn(async_db)`` on a fresh AsyncSession, as the routers do."""
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await coroutine_fn(db)
+    return lambda db: asyncio.run(run())
+
+
+def page(stmt, **cursor):
+    return run_async(lambda db: keyset_page_async(db, stmt, models.StatusUpdate, 100, **cursor))
+
+
+def stream(stmt, serialize, **cursor):
+    async def drain():
+        response = stream_rows(stmt, models.StatusUpdate, serialize, "ndjson", **cursor)
+        return [chunk async for chunk in response.body_iterator]
+    return lambda db: asyncio.run(drain())
+
+
+def tasks(**filters):
+    params = {"status": None, "assignee_email": None, "due_from": None, "due_to": None, "since": None}
+    params.update(filters)
+    return lambda db: list_tasks(Response(), db, limit=50, offset=0, **params)
+
+
+def hot_queries(task_id, consultant_id, consultant_email):
+    """Name -> callable(db) for every query path the check covers."""
+    return {
+        "dashboard summary": get_dashboard_summary,
+        "updates first page": page(build_updates_query()),
+        "updates before cursor": page(build_updates_query(), before=2),
+        "updates after cursor": page(build_updates_query(), after=1),
+        "updates stream": stream(build_updates_query(), update_to_dict, before=2),
+        "leave updates pending": page(build_leave_updates_query(0)),
+        "leave updates before cursor": page(build_leave_updates_query(0), before=2),
+        "leave updates stream": stream(build_leave_updates_query(0), leave_update_to_dict),
+        "tasks by status": tasks(status=models.StatusEnum.IN_PROGRESS),
+        "tasks by assignee": tasks(assignee_email=consultant_email),
+        "tasks due in range": tasks(due_from=datetime(1999, 1, 1), due_to=datetime(2001, 1, 1)),
+        "send-mail task lookup": lambda db: db.query(models.Task).filter(models.Task.id == task_id).first(),
+        "send-mail consultant lookup": lambda db: db.query(models.Consultant).filter(
+            models.Consultant.email == consultant_email).first(),
+        "send-mail latest leave update": lambda db: latest_leave_update(db, task_id, consultant_id),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query plan uses a full table scan")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    failures = []
+    try:
+        for name, run in hot_queries(*seed(db)).items():
+            db.expunge_all()
+            with capture_statements() as statements:
+                run(db)
+            for statement, parameters in statements:
+                plan = explain(statement, parameters)
+                scans = [line for line in plan if FULL_SCAN_RE.match(line)]
+                status = "FULL SCAN" if scans else "ok"
+                print(f"{status:<10} {name}")
+                if scans:
+                    failures.append((name, statement, plan))
+                if args.verbose or scans:
+                    for line in plan:
+                        print(f"{'':<13}{line}")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n{len(failures)} statement(s) fell back to a full table scan")
+        for name, statement, _ in failures:
+            print(f"\n[{name}]\n{statement}")
+        sys.exit(1)
+    print("\nall hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
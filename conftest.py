@@ -0,0 +1,15 @@
+import pytest
+
+from backend.utils.query_profiler import QueryProfile
+
+
+@pytest.fixture
+def query_profile():
+    """Profile every statement the test runs; fail it if a budget is exceeded.
+
+    Budgets come from the QUERY_PROFILE_* settings and can be tightened in the
+    test, e.g. ``query_profile.max_repeats = 1``.
+    """
+    with QueryProfile() as profile:
+        yield profile
+    profile.check("raise")
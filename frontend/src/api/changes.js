@@ -0,0 +1,21 @@
+import { useEffect, useRef } from "react";
+import api from "./api";
+
+// Subscribe to the backend change feed (/changes/stream, Server-Sent Events)
+// from the X-Change-Cursor returned with the initial fetch, so nothing written
+// in between is missed. onChange(event, data) runs for every "task" and
+// "status_update" change. Nothing happens until `since` is known, and never on
+// a database without change cursors (the header is absent there).
+export function useChangeFeed(since, onChange) {
+  const handler = useRef(onChange);
+  handler.current = onChange;
+
+  useEffect(() => {
+    if (since === null || since === undefined) return undefined;
+    const source = new EventSource(`${api.defaults.baseURL}/changes/stream?since=${since}`);
+    const listener = (e) => handler.current(e.type, JSON.parse(e.data));
+    source.addEventListener("task", listener);
+    source.addEventListener("status_update", listener);
+    return () => source.close();
+  }, [since]);
+}
@@ -1,6 +1,7 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { Row, Col, Card, Statistic, List, Modal, Button } from "antd";
 import api from "../api/api";
+import { useChangeFeed } from "../api/changes";
 
 function Dashboard() {
   const [stats, setStats] = useState({
@@ -13,10 +14,30 @@ function Dashboard() {
   const [modalTitle, setModalTitle] = useState("");
   const [modalContent, setModalContent] = useState([]);
 
+  const [changeCursor, setChangeCursor] = useState(null);
+  const refreshTimer = useRef(null);
+
+  const fetchSummary = () =>
+    api.get("/summary/dashboard").then((res) => {
+      setStats(res.data);
+      // keep the first cursor: the feed stays connected across refreshes
+      setChangeCursor((cursor) => cursor ?? res.headers["x-change-cursor"]);
+    });
+
   useEffect(() => {
-    api.get("/summary/dashboard").then((res) => setStats(res.data));
+    fetchSummary();
+    return () => clearTimeout(refreshTimer.current);
   }, []);
 
+  // Re-fetch when tasks or updates change, at most once a second
+  useChangeFeed(changeCursor, () => {
+    if (refreshTimer.current) return;
+    refreshTimer.current = setTimeout(() => {
+      refreshTimer.current = null;
+      fetchSummary();
+    }, 1000);
+  });
+
   const showModal = (title, content) => {
     setModalTitle(title);
     setModalContent(content);
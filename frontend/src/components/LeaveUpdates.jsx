@@ -7,6 +7,7 @@ import {
   UserOutlined, CalendarOutlined, WarningOutlined,ClockCircleOutlined, 
 } from "@ant-design/icons";
 import api from "../api/api";
+import { useChangeFeed } from "../api/changes";
 import { useNavigate } from "react-router-dom";
 
 const { Text, Title } = Typography;
@@ -14,12 +15,13 @@ const { Text, Title } = Typography;
 function LeaveUpdates() {
   const [leaveUpdates, setLeaveUpdates] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [changeCursor, setChangeCursor] = useState(null);
   const navigate = useNavigate();
 
   useEffect(() => {
     const fetchLeaveUpdates = async () => {
       try {
-        const res = await api.get("/leave-updates/?state=0");
+        const res = await api.get("/leave-updates/?state=0&stream=json");
         const data = res.data;
 
         const uniqueUpdates = data.reduce((acc, item) => {
@@ -30,6 +32,7 @@ function LeaveUpdates() {
         }, {});
 
         setLeaveUpdates(Object.values(uniqueUpdates));
+        setChangeCursor(res.headers["x-change-cursor"]);
       } catch (err) {
         console.error("Error fetching leave updates:", err);
       } finally {
@@ -40,6 +43,19 @@ function LeaveUpdates() {
     fetchLeaveUpdates();
   }, []);
 
+  // New leave requests appear, answered ones (state 1) drop out
+  useChangeFeed(changeCursor, (event, item) => {
+    if (event !== "status_update" || item.intent !== "leave") return;
+    setLeaveUpdates((prev) => {
+      if (item.state !== 0) return prev.filter((u) => u.id !== item.id);
+      const existing = prev.find((u) => u.consultant_email === item.consultant_email);
+      if (existing && existing.id !== item.id && new Date(existing.created_at) > new Date(item.created_at)) {
+        return prev;
+      }
+      return [...prev.filter((u) => u.consultant_email !== item.consultant_email), item];
+    });
+  });
+
   const handleMailClick = (update) => {
     navigate("/draft-reply", {
       state: {
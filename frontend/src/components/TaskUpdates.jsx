@@ -8,12 +8,14 @@ import {
   StopOutlined, UserOutlined, CalendarOutlined, ProfileOutlined,
 } from "@ant-design/icons";
 import api from "../api/api";
+import { useChangeFeed } from "../api/changes";
 
 const { Text, Title } = Typography;
 
 function TaskUpdates() {
   const [groupedUpdates, setGroupedUpdates] = useState({});
   const [loading, setLoading] = useState(true);
+  const [changeCursor, setChangeCursor] = useState(null);
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -38,7 +40,7 @@ function TaskUpdates() {
   useEffect(() => {
     const fetchUpdates = async () => {
       try {
-        const res = await api.get("/updates/");
+        const res = await api.get("/updates/?stream=json");
         const data = res.data;
 
         const uniqueUpdates = data.reduce((acc, item) => {
@@ -56,6 +58,7 @@ function TaskUpdates() {
         }, {});
 
         setGroupedUpdates(groupedByTask);
+        setChangeCursor(res.headers["x-change-cursor"]);
       } catch (err) {
         console.error("Error fetching updates:", err);
       } finally {
@@ -66,6 +69,22 @@ function TaskUpdates() {
     fetchUpdates();
   }, []);
 
+  // Merge pushed updates rather than re-fetching the whole list
+  useChangeFeed(changeCursor, (event, item) => {
+    if (event !== "status_update" || item.op === "delete") return;
+    setGroupedUpdates((prev) => {
+      const current = prev[item.task_name] || [];
+      const existing = current.find((u) => u.consultant_email === item.consultant_email);
+      if (existing && existing.id !== item.id && new Date(existing.created_at) > new Date(item.created_at)) {
+        return prev;
+      }
+      return {
+        ...prev,
+        [item.task_name]: [...current.filter((u) => u.consultant_email !== item.consultant_email), item],
+      };
+    });
+  });
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -4,13 +4,17 @@ import api from "../api/api";
 
 function Tasks({ refreshKey }) {
   const [tasks, setTasks] = useState([]);
+  const [pagination, setPagination] = useState({ current: 1, pageSize: 10, total: 0 });
   const [visible, setVisible] = useState(false);
   const [form] = Form.useForm();
 
-  const fetchTasks = async () => {
+  const fetchTasks = async (page = pagination.current, pageSize = pagination.pageSize) => {
     try {
-      const res = await api.get("/tasks/");
+      const res = await api.get("/tasks/", {
+        params: { limit: pageSize, offset: (page - 1) * pageSize },
+      });
       setTasks(res.data);
+      setPagination({ current: page, pageSize, total: Number(res.headers["x-total-count"] || 0) });
     } catch (err) {
       message.error("Failed to fetch tasks");
     }
@@ -46,6 +50,8 @@ function Tasks({ refreshKey }) {
       <Table
         rowKey="id"
         dataSource={tasks}
+        pagination={pagination}
+        onChange={(p) => fetchTasks(p.current, p.pageSize)}
         columns={[
           { title: "Task ID", dataIndex: "id", key: "id" },
           { title: "Task Name", dataIndex: "name" },